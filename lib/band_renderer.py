@@ -0,0 +1,305 @@
+"""Display-list renderer drawing the screen in horizontal bands."""
+from framebuf import FrameBuffer, RGB565  # type: ignore
+from micropython import const  # type: ignore
+
+# Display list opcodes
+FILL_RECT = const(0)
+RECT = const(1)
+LINE = const(2)
+ELLIPSE = const(3)
+SPRITE = const(4)
+TEXT = const(5)
+TEXT8X8 = const(6)
+
+
+def swap_bytes(color):
+    """Return RGB565 color with its bytes swapped.
+
+    Args:
+        color (int): RGB565 color value.
+    Note:
+        FrameBuffer stores RGB565 little endian while the ILI9341 expects
+        big endian, so colors are swapped before being drawn into a band.
+    """
+    return ((color & 0xFF) << 8) | (color >> 8)
+
+
+class BandRenderer(object):
+    """Record draw commands and render them one horizontal band at a time.
+
+    A full 320x240 RGB565 frame needs 150 KB, so instead of a frame buffer
+    only a single band (e.g. 320x16 = 10 KB) is kept in RAM.  On render()
+    each band is cleared, every command overlapping it is replayed with
+    FrameBuffer (which clips for free) and the band is sent in one block.
+    Overlapping commands are composited in RAM so each pixel goes over SPI
+    exactly once per frame.
+
+    Attributes:
+        display: Display object the bands are sent to
+        band_height: Height of a band in pixels
+        background: RGB565 color each band is cleared to
+        commands: Recorded display list
+    """
+
+    def __init__(self, display, band_height=16, background=0):
+        """Initialize band renderer.
+
+        Args:
+            display (Display): Display to render to.
+            band_height (Optional int): Height of each band (default 16).
+            background (Optional int): RGB565 background color (default 0).
+        """
+        self.display = display
+        self.band_height = band_height
+        self.background = background
+        self.commands = []
+        self.band = bytearray(display.width * band_height * 2)
+        self.fbuf = FrameBuffer(self.band, display.width, band_height, RGB565)
+
+    def clear(self, color=0):
+        """Discard the display list and set the background color.
+
+        Args:
+            color (Optional int): RGB565 color value (Default: 0 = Black).
+        """
+        self.commands = []
+        self.background = color
+
+    def draw_circle(self, x0, y0, r, color):
+        """Record a circle.
+
+        Args:
+            x0 (int): X coordinate of center point.
+            y0 (int): Y coordinate of center point.
+            r (int): Radius.
+            color (int): RGB565 color value.
+        """
+        self.draw_ellipse(x0, y0, r, r, color)
+
+    def draw_ellipse(self, x0, y0, a, b, color):
+        """Record an ellipse.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            a (int): Semi axis horizontal.
+            b (int): Semi axis vertical.
+            color (int): RGB565 color value.
+        """
+        self.commands.append((ELLIPSE, y0 - b, y0 + b,
+                              x0, y0, a, b, swap_bytes(color), False))
+
+    def draw_hline(self, x, y, w, color):
+        """Record a horizontal line.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of line.
+            color (int): RGB565 color value.
+        """
+        self.fill_rectangle(x, y, w, 1, color)
+
+    def draw_line(self, x1, y1, x2, y2, color):
+        """Record a line.
+
+        Args:
+            x1, y1 (int): Starting coordinates of the line
+            x2, y2 (int): Ending coordinates of the line
+            color (int): RGB565 color value.
+        """
+        self.commands.append((LINE, min(y1, y2), max(y1, y2),
+                              x1, y1, x2, y2, swap_bytes(color)))
+
+    def draw_rectangle(self, x, y, w, h, color):
+        """Record a rectangle outline.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        """
+        self.commands.append((RECT, y, y + h - 1,
+                              x, y, w, h, swap_bytes(color)))
+
+    def draw_sprite(self, buf, x, y, w, h, key=-1):
+        """Record a sprite.
+
+        Args:
+            buf (bytearray): Sprite pixel data (as returned by load_sprite).
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of sprite.
+            h (int): Height of sprite.
+            key (Optional int): RGB565 color to treat as transparent
+                (default -1 = opaque).
+        """
+        if key != -1:
+            key = swap_bytes(key)
+        sprite = FrameBuffer(buf if isinstance(buf, bytearray)
+                             else bytearray(buf), w, h, RGB565)
+        self.commands.append((SPRITE, y, y + h - 1, x, y, sprite, key))
+
+    def draw_text(self, x, y, text, font, color, background=None, spacing=1):
+        """Record text drawn with an X-GLCD font.
+
+        Args:
+            x (int): Starting X position
+            y (int): Starting Y position
+            text (string): Text to draw
+            font (XglcdFont object): Font
+            color (int): RGB565 color value
+            background (Optional int): RGB565 background color
+                (default: None = transparent)
+            spacing (int): Pixels between letters (default: 1)
+        """
+        self.commands.append((TEXT, y, y + font.height - 1,
+                              x, y, text, font, color, background, spacing))
+
+    def draw_text8x8(self, x, y, text, color):
+        """Record text drawn with the built-in MicroPython 8x8 font.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            text (string): Text to draw.
+            color (int): RGB565 color value.
+        """
+        self.commands.append((TEXT8X8, y, y + 7,
+                              x, y, text, swap_bytes(color)))
+
+    def draw_vline(self, x, y, h, color):
+        """Record a vertical line.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            h (int): Height of line.
+            color (int): RGB565 color value.
+        """
+        self.fill_rectangle(x, y, 1, h, color)
+
+    def fill_circle(self, x0, y0, r, color):
+        """Record a filled circle.
+
+        Args:
+            x0 (int): X coordinate of center point.
+            y0 (int): Y coordinate of center point.
+            r (int): Radius.
+            color (int): RGB565 color value.
+        """
+        self.fill_ellipse(x0, y0, r, r, color)
+
+    def fill_ellipse(self, x0, y0, a, b, color):
+        """Record a filled ellipse.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            a (int): Semi axis horizontal.
+            b (int): Semi axis vertical.
+            color (int): RGB565 color value.
+        """
+        self.commands.append((ELLIPSE, y0 - b, y0 + b,
+                              x0, y0, a, b, swap_bytes(color), True))
+
+    def fill_rectangle(self, x, y, w, h, color):
+        """Record a filled rectangle.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        """
+        self.commands.append((FILL_RECT, y, y + h - 1,
+                              x, y, w, h, swap_bytes(color)))
+
+    def get_glyphs(self, command):
+        """Expand the letters of a text command into FrameBuffers.
+
+        Args:
+            command (tuple): TEXT display list entry.
+        Returns:
+            [(int, FrameBuffer, int, int)]: X offset, glyph, width and
+                transparent key of every letter.
+        """
+        _, _, _, x, _, text, font, color, background, spacing = command
+        # Transparent text uses a background that can't clash with color
+        bg = color ^ 1 if background is None else background
+        key = swap_bytes(bg) if background is None else -1
+        glyphs = []
+        for letter in text:
+            buf, w, h = font.get_letter(letter, color, bg)
+            if w == 0:
+                break
+            glyphs.append((x, FrameBuffer(buf, w, h, RGB565), w, key))
+            x += w + spacing
+        return glyphs
+
+    def render(self, clear=True):
+        """Render the display list to the panel band by band.
+
+        Args:
+            clear (Optional bool): Discard the display list afterwards
+                (default True).
+        """
+        display = self.display
+        fbuf = self.fbuf
+        band = self.band
+        band_height = self.band_height
+        width = display.width
+        height = display.height
+        background = swap_bytes(self.background)
+        commands = self.commands
+        glyph_cache = {}
+        for band_y in range(0, height, band_height):
+            band_y1 = min(band_y + band_height, height) - 1
+            fbuf.fill(background)
+            for i, command in enumerate(commands):
+                op = command[0]
+                if command[1] > band_y1 or command[2] < band_y:
+                    continue
+                if op == FILL_RECT:
+                    _, _, _, x, y, w, h, color = command
+                    fbuf.fill_rect(x, y - band_y, w, h, color)
+                elif op == RECT:
+                    _, _, _, x, y, w, h, color = command
+                    fbuf.rect(x, y - band_y, w, h, color)
+                elif op == LINE:
+                    _, _, _, x1, y1, x2, y2, color = command
+                    fbuf.line(x1, y1 - band_y, x2, y2 - band_y, color)
+                elif op == ELLIPSE:
+                    _, _, _, x0, y0, a, b, color, fill = command
+                    fbuf.ellipse(x0, y0 - band_y, a, b, color, fill)
+                elif op == SPRITE:
+                    _, _, _, x, y, sprite, key = command
+                    fbuf.blit(sprite, x, y - band_y, key)
+                elif op == TEXT:
+                    glyphs = glyph_cache.get(i)
+                    if glyphs is None:
+                        glyphs = self.get_glyphs(command)
+                        glyph_cache[i] = glyphs
+                    y = command[4] - band_y
+                    for x, glyph, w, key in glyphs:
+                        fbuf.blit(glyph, x, y, key)
+                    background_fill = command[8]
+                    if background_fill is not None and command[9]:
+                        # Fill in letter spacing
+                        spacing = command[9]
+                        color = swap_bytes(background_fill)
+                        for x, glyph, w, key in glyphs:
+                            fbuf.fill_rect(x + w, y, spacing,
+                                           command[6].height, color)
+                    if command[2] <= band_y1:
+                        # Last band touching this text
+                        del glyph_cache[i]
+                elif op == TEXT8X8:
+                    _, _, _, x, y, text, color = command
+                    fbuf.text(text, x, y - band_y, color)
+            rows = band_y1 - band_y + 1
+            display.block(0, band_y, width - 1, band_y1,
+                          memoryview(band)[:rows * width * 2])
+        if clear:
+            self.commands = []
@@ -0,0 +1,142 @@
+"""Reusable transfer buffers for the ILI9341 driver."""
+
+
+class BufferPool(object):
+    """Preallocated scratch buffers and cached solid color fill buffers.
+
+    Attributes:
+        budget: Maximum bytes held by cached fill buffers
+        fills: Dict of RGB565 color to cached fill bytearray
+        order: Cached colors, least recently used first
+        scratch_bufs: List of scratch bytearrays (one per slot)
+        hits: Fill requests served from the cache
+        misses: Fill requests that had to build a buffer
+        evictions: Fill buffers dropped to stay within budget
+        allocations: Number of bytearrays allocated by the pool
+        allocated_bytes: Total bytes allocated by the pool
+
+    Note:
+        Fill buffers are never modified once built, so a slice of one can
+        safely be handed to an asynchronous transfer.  Scratch buffers are
+        shared: the caller must be done with a slot before it is requested
+        again.  Display uses slot 0 for blits, slot 1 for glyphs, slots
+        2 and 3 for image streaming (held across awaits by
+        draw_image_async), slot 4 for compressed input, slot 5 for lines of
+        text and slot 6 for composing sprites.
+        Slots are allocated on first use and then kept.
+    """
+
+    def __init__(self, budget=16384, scratch_size=2048, scratch_slots=7):
+        """Constructor for buffer pool.
+
+        Args:
+            budget (Optional int): Byte budget for fill buffers (default 16K).
+            scratch_size (Optional int): Minimum size of each scratch buffer
+                (default 2048).
+            scratch_slots (Optional int): Number of scratch buffers
+                (default 7).
+        """
+        self.budget = budget
+        self.fills = {}
+        self.order = []
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.scratch_size = scratch_size
+        self.scratch_bufs = [None] * scratch_slots
+
+    def allocate(self, size):
+        """Allocate a bytearray and record it in the statistics.
+
+        Args:
+            size (int): Size in bytes.
+        Returns:
+            bytearray: New zeroed buffer.
+        """
+        self.allocations += 1
+        self.allocated_bytes += size
+        return bytearray(size)
+
+    def fill(self, color, size):
+        """Return a buffer of one solid color.
+
+        Args:
+            color (int): RGB565 color value.
+            size (int): Size in bytes (even).
+        Returns:
+            memoryview: size bytes of big endian color data.
+        Note:
+            Buffers larger than the budget are built without evicting or
+            caching anything.
+        """
+        buf = self.fills.get(color)
+        if buf is not None and len(buf) >= size:
+            self.hits += 1
+            order = self.order
+            if order[-1] != color:
+                order.remove(color)
+                order.append(color)
+            return memoryview(buf)[:size]
+        self.misses += 1
+        cached = buf
+        buf = self.allocate(size)
+        if color:
+            pair = color.to_bytes(2, 'big')
+            buf[0:2] = pair
+            # Double the filled part until the buffer is full
+            filled = 2
+            while filled < size:
+                n = min(filled, size - filled)
+                buf[filled:filled + n] = buf[0:n]
+                filled += n
+        if size > self.budget:
+            # Too large to cache, keep the cached colors
+            return memoryview(buf)
+        if cached is not None:
+            # Cached buffer is too small, replace it
+            self.order.remove(color)
+            self.used -= len(cached)
+            del self.fills[color]
+        # Evict least recently used colors to stay within budget
+        while self.order and self.used + size > self.budget:
+            old = self.order.pop(0)
+            self.used -= len(self.fills.pop(old))
+            self.evictions += 1
+        self.fills[color] = buf
+        self.order.append(color)
+        self.used += size
+        return memoryview(buf)
+
+    def scratch(self, size, slot=0):
+        """Return a scratch buffer of at least size bytes.
+
+        Args:
+            size (int): Size in bytes.
+            slot (Optional int): Scratch slot (default 0).
+        Returns:
+            memoryview: size bytes of the slot's buffer (contents undefined).
+        """
+        buf = self.scratch_bufs[slot]
+        if buf is None or len(buf) < size:
+            buf = self.allocate(max(size, self.scratch_size))
+            self.scratch_bufs[slot] = buf
+        return memoryview(buf)[:size]
+
+    def stats(self):
+        """Return pool statistics.
+
+        Returns:
+            dict: Hits, misses, evictions, allocations and byte counts.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'allocations': self.allocations,
+            'allocated_bytes': self.allocated_bytes,
+            'cached_bytes': self.used,
+            'cached_colors': len(self.order),
+        }
@@ -0,0 +1,303 @@
+"""Off-screen buffered ILI9341 display."""
+import asyncio
+from lib.ili9341 import Display
+
+
+class BufferedDisplay(Display):
+    """ILI9341 display that renders into an in-RAM RGB565 buffer.
+
+    Every drawing primitive of Display goes through block(), so this class
+    only has to redirect block() into the buffer.  Changed areas are tracked
+    as dirty rectangles and sent to the panel on flush().
+
+    Attributes:
+        buf_x, buf_y: Top left corner of the buffered region
+        buf_w, buf_h: Size of the buffered region
+        buffer: RGB565 (big endian) pixel data of the region
+        dirty: List of dirty rectangles [x0, y0, x1, y1] (inclusive)
+
+    Note:
+        A full 320x240 frame needs 150 KB, which rarely fits next to WiFi on
+        a Pico W.  Pass a smaller region to only buffer the area a mode
+        redraws.  Blocks that fall partly outside the region are written
+        straight to the panel (the overlapping part is still copied into the
+        buffer so it stays in sync).
+    """
+
+    def __init__(self, spi, cs, dc, rst, width=240, height=320, rotation=0,
+                 bgr=True, gamma=True, region=None, max_dirty=8,
+                 flush_bytes=2048):
+        """Initialize buffered display.
+
+        Args:
+            spi, cs, dc, rst, width, height, rotation, bgr, gamma:
+                See Display.
+            region (Optional (int, int, int, int)): x, y, w, h of the area
+                to buffer (default: whole screen).
+            max_dirty (Optional int): Maximum number of dirty rectangles
+                kept before they are merged (default 8).
+            flush_bytes (Optional int): Size of the scratch buffer used to
+                send rectangles narrower than the region (default 2048).
+        """
+        super().__init__(spi, cs, dc, rst, width, height, rotation, bgr,
+                         gamma)
+        if region is None:
+            region = (0, 0, self.width, self.height)
+        x, y, w, h = region
+        if (x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > self.width or
+                y + h > self.height):
+            raise ValueError('Buffer region must be within the display.')
+        self.buf_x = x
+        self.buf_y = y
+        self.buf_w = w
+        self.buf_h = h
+        # Display.__init__ has just cleared the panel to black
+        self.buffer = bytearray(w * h * 2)
+        self.dirty = []
+        self.max_dirty = max_dirty
+        self.scratch = bytearray(max(flush_bytes, w * 2))
+        # Keep the direct panel write and route primitives to the buffer
+        self.block_direct = self.block
+        self.block = self.block_buffered
+
+    async def block_async(self, x0, y0, x1, y1, data, chunk_size=4096):
+        """Write a block of data, yielding between chunks of rows.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+            chunk_size (Optional int): Bytes written between yields
+                (default 4096).
+        Note:
+            Display.block_async continues the panel write with
+            WRITE_RAM_CONTINUE, which would bypass the buffer.  Here each
+            chunk of whole rows is a block of its own.
+        """
+        mv = memoryview(data)
+        stride = (x1 - x0 + 1) * 2
+        chunk_rows = max(chunk_size // stride, 1)
+        async with self.transfer_lock:
+            y = y0
+            while y <= y1:
+                n = min(chunk_rows, y1 - y + 1)
+                offset = (y - y0) * stride
+                self.block(x0, y, x1, y + n - 1,
+                           mv[offset:offset + n * stride])
+                y += n
+                if y <= y1:
+                    await asyncio.sleep(0)
+
+    def block_buffered(self, x0, y0, x1, y1, data):
+        """Write a block of data to the buffer.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        bx0 = self.buf_x
+        by0 = self.buf_y
+        bx1 = bx0 + self.buf_w - 1
+        by1 = by0 + self.buf_h - 1
+        # Intersection of block and buffered region
+        ix0 = max(x0, bx0)
+        iy0 = max(y0, by0)
+        ix1 = min(x1, bx1)
+        iy1 = min(y1, by1)
+        inside = ix0 <= ix1 and iy0 <= iy1
+        if inside:
+            self.copy_in(x0, y0, x1, y1, data, ix0, iy0, ix1, iy1)
+        if inside and (ix0, iy0, ix1, iy1) == (x0, y0, x1, y1):
+            self.mark_dirty(x0, y0, x1, y1)
+        else:
+            # Block leaves the region so send it straight away
+            self.block_direct(x0, y0, x1, y1, data)
+
+    def cleanup(self):
+        """Clean up resources (drawing directly to the panel)."""
+        self.block = self.block_direct
+        super().cleanup()
+
+    def copy_in(self, x0, y0, x1, y1, data, ix0, iy0, ix1, iy1):
+        """Copy the intersecting part of a block into the buffer.
+
+        Args:
+            x0, y0, x1, y1 (int): Block window.
+            data (bytes): Block pixel data.
+            ix0, iy0, ix1, iy1 (int): Intersection with the buffered region.
+        """
+        src = memoryview(data)
+        buf = self.buffer
+        src_stride = (x1 - x0 + 1) * 2
+        dst_stride = self.buf_w * 2
+        row_bytes = (ix1 - ix0 + 1) * 2
+        rows = min(iy1 - iy0 + 1, len(data) // src_stride - (iy0 - y0))
+        s = (iy0 - y0) * src_stride + (ix0 - x0) * 2
+        d = (iy0 - self.buf_y) * dst_stride + (ix0 - self.buf_x) * 2
+        if row_bytes == src_stride == dst_stride:
+            # Rows are contiguous in both buffers
+            size = rows * row_bytes
+            buf[d:d + size] = src[s:s + size]
+            return
+        for _ in range(rows):
+            buf[d:d + row_bytes] = src[s:s + row_bytes]
+            s += src_stride
+            d += dst_stride
+
+    def mark_dirty(self, x0, y0, x1, y1):
+        """Add a rectangle to the dirty list, merging where possible.
+
+        Args:
+            x0, y0, x1, y1 (int): Rectangle corners (inclusive).
+        """
+        dirty = self.dirty
+        # Absorb every rectangle that overlaps or touches the new one
+        i = 0
+        while i < len(dirty):
+            r = dirty[i]
+            if (x0 <= r[2] + 1 and r[0] <= x1 + 1 and
+                    y0 <= r[3] + 1 and r[1] <= y1 + 1):
+                x0 = min(x0, r[0])
+                y0 = min(y0, r[1])
+                x1 = max(x1, r[2])
+                y1 = max(y1, r[3])
+                dirty.pop(i)
+                i = 0
+            else:
+                i += 1
+        if len(dirty) >= self.max_dirty:
+            # Merge into the rectangle whose bounding box grows the least
+            best = 0
+            best_cost = None
+            for i, r in enumerate(dirty):
+                cost = ((max(x1, r[2]) - min(x0, r[0]) + 1) *
+                        (max(y1, r[3]) - min(y0, r[1]) + 1) -
+                        (r[2] - r[0] + 1) * (r[3] - r[1] + 1))
+                if best_cost is None or cost < best_cost:
+                    best = i
+                    best_cost = cost
+            r = dirty.pop(best)
+            self.mark_dirty(min(x0, r[0]), min(y0, r[1]),
+                            max(x1, r[2]), max(y1, r[3]))
+            return
+        dirty.append([x0, y0, x1, y1])
+
+    def draw_sprite_transformed(self, buf, x, y, w, h, rotate=0,
+                                mirror_x=False, mirror_y=False):
+        """Draw a rotated and/or mirrored sprite.
+
+        Args:
+            buf (bytearray): Buffer to draw.
+            x (int): X position of the transformed sprite's left edge.
+            y (int): Y position of the transformed sprite's top edge.
+            w (int): Width of the sprite data.
+            h (int): Height of the sprite data.
+            rotate (Optional int): Clockwise rotation 0, 90, 180 or 270
+                (applied after mirroring).
+            mirror_x (Optional bool): Flip the sprite left to right.
+            mirror_y (Optional bool): Flip the sprite top to bottom.
+        Note:
+            The panel's address mode cannot transform data copied into the
+            buffer, so the part inside the buffered region is transformed
+            pixel by pixel.  Like block_buffered, sprites that leave the
+            region are also sent straight to the panel (using the panel
+            transform, see Display.draw_sprite_transformed).
+        """
+        ta, tb, tc, td, tx, ty = self.sprite_transform(x, y, w, h, rotate,
+                                                       mirror_x, mirror_y)
+        fw, fh = (h, w) if rotate % 180 else (w, h)
+        vx0 = max(x, self.clip_x0)
+        vy0 = max(y, self.clip_y0)
+        vx1 = min(x + fw - 1, self.clip_x1)
+        vy1 = min(y + fh - 1, self.clip_y1)
+        if vx0 > vx1 or vy0 > vy1:
+            return
+        bx0 = self.buf_x
+        by0 = self.buf_y
+        ix0 = max(vx0, bx0)
+        iy0 = max(vy0, by0)
+        ix1 = min(vx1, bx0 + self.buf_w - 1)
+        iy1 = min(vy1, by0 + self.buf_h - 1)
+        if ix0 <= ix1 and iy0 <= iy1:
+            src = memoryview(buf)
+            dst = self.buffer
+            stride = w * 2
+            dst_stride = self.buf_w * 2
+            # Sprite offset of one step right along a screen row
+            step = (ta + tb * w) * 2
+            for sy in range(iy0, iy1 + 1):
+                i = ta * (ix0 - tx) + tc * (sy - ty)
+                j = tb * (ix0 - tx) + td * (sy - ty)
+                s = j * stride + i * 2
+                d = (sy - by0) * dst_stride + (ix0 - bx0) * 2
+                for _ in range(ix1 - ix0 + 1):
+                    dst[d] = src[s]
+                    dst[d + 1] = src[s + 1]
+                    s += step
+                    d += 2
+        if (ix0, iy0, ix1, iy1) == (vx0, vy0, vx1, vy1):
+            self.mark_dirty(ix0, iy0, ix1, iy1)
+            return
+        block = self.block
+        self.block = self.block_direct
+        try:
+            super().draw_sprite_transformed(buf, x, y, w, h, rotate,
+                                            mirror_x, mirror_y)
+        finally:
+            self.block = block
+
+    def flush(self):
+        """Send all dirty rectangles to the panel.
+
+        Returns:
+            int: Number of pixel bytes sent.
+        """
+        sent = 0
+        for x0, y0, x1, y1 in self.dirty:
+            sent += self.flush_rect(x0, y0, x1, y1)
+        self.dirty = []
+        return sent
+
+    def flush_rect(self, x0, y0, x1, y1):
+        """Send one rectangle of the buffer to the panel.
+
+        Args:
+            x0, y0, x1, y1 (int): Rectangle corners (inclusive).
+        Returns:
+            int: Number of pixel bytes sent.
+        """
+        mv = memoryview(self.buffer)
+        stride = self.buf_w * 2
+        row_bytes = (x1 - x0 + 1) * 2
+        offset = (y0 - self.buf_y) * stride + (x0 - self.buf_x) * 2
+        rows = y1 - y0 + 1
+        if row_bytes == stride:
+            # Full width rows are contiguous in the buffer
+            self.block_direct(x0, y0, x1, y1,
+                              mv[offset:offset + rows * stride])
+            return rows * stride
+        scratch = self.scratch
+        chunk_rows = len(scratch) // row_bytes
+        y = y0
+        while y <= y1:
+            n = min(chunk_rows, y1 - y + 1)
+            d = 0
+            for _ in range(n):
+                scratch[d:d + row_bytes] = mv[offset:offset + row_bytes]
+                d += row_bytes
+                offset += stride
+            self.block_direct(x0, y, x1, y + n - 1, memoryview(scratch)[:d])
+            y += n
+        return rows * row_bytes
+
+    def invalidate(self):
+        """Mark the whole buffered region as dirty."""
+        self.dirty = []
+        self.mark_dirty(self.buf_x, self.buf_y,
+                        self.buf_x + self.buf_w - 1,
+                        self.buf_y + self.buf_h - 1)
@@ -0,0 +1,151 @@
+"""Glyph rasterizer benchmark.
+
+Times XglcdFont.get_letter (cache off) against the reference rasterizer
+it replaced, which walked the set bits of each font byte, and checks both
+produce the same pixels.  Run on the host from the repository root with:
+    python3 -m lib.glyph_benchmark
+or on the device with:
+    from lib.glyph_benchmark import main
+    main()
+Fonts are loaded from their X-GLCD 'C' files so neither rasterizer reads
+glyph bytes from flash while it is timed.
+"""
+from lib.xglcd_font import XglcdFont
+
+try:
+    from utime import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+# Dict to translate bitwise values to byte position
+BIT_POS = {1: 0, 2: 2, 4: 4, 8: 6, 16: 8, 32: 10, 64: 12, 128: 14, 256: 16}
+
+# Fonts benchmarked by main: (path, width, height)
+FONTS = (('fonts/Monogram7x9.c', 7, 9), ('fonts/Monogram13x18.c', 13, 18))
+
+
+def lit_bits(n):
+    """Return positions of 1 bits only."""
+    while n:
+        b = n & (~n+1)
+        yield BIT_POS[b]
+        n ^= b
+
+
+def reference_letter(font, letter, color, background=0, landscape=False):
+    """Convert letter byte data to pixels one lit bit at a time.
+
+    Args:
+        font (XglcdFont): 1-bit font.
+        letter (string): Letter to return (must exist within font).
+        color (int): RGB565 color value.
+        background (int): RGB565 background color (default: black).
+        landscape (bool): Orientation (default: False = portrait)
+    Returns:
+        (bytearray): Pixel data.
+        (int, int): Letter width and height.
+    Note:
+        This is the rasterizer get_letter used before byte expansion
+        tables, kept to measure against.
+    """
+    letter_ord = ord(letter) - font.start_letter
+    mv = font.letter_data(letter_ord)
+    letter_width = font.widths[letter_ord]
+    letter_height = font.height
+    letter_size = letter_height * letter_width
+    buf = bytearray(background.to_bytes(2, 'big') * letter_size)
+    msb, lsb = color.to_bytes(2, 'big')
+
+    if landscape:
+        # Populate buffer in order for landscape
+        pos = (letter_size * 2) - (letter_height * 2)
+        lh = letter_height
+        for b in mv:
+            for bit in lit_bits(b):
+                buf[bit + pos] = msb
+                buf[bit + pos + 1] = lsb
+            if lh > 8:
+                # Increment position by double byte
+                pos += 16
+                lh -= 8
+            else:
+                # Decrease position to start of previous column
+                pos -= (letter_height * 4) - (lh * 2)
+                lh = letter_height
+    else:
+        # Populate buffer in order for portrait
+        col = 0
+        bytes_per_letter = (letter_height + 7) // 8
+        letter_byte = 0
+        for b in mv:
+            segment_size = letter_byte * letter_width * 16
+            for bit in lit_bits(b):
+                pos = (bit * letter_width) + (col * 2) + segment_size
+                buf[pos] = msb
+                buf[pos + 1] = lsb
+            letter_byte += 1
+            if letter_byte + 1 > bytes_per_letter:
+                col += 1
+                letter_byte = 0
+    return buf, letter_width, letter_height
+
+
+def benchmark(font, name, rounds=5, color=0xFFFF, background=0):
+    """Print glyphs per second of the reference rasterizer and get_letter.
+
+    Args:
+        font (XglcdFont): 1-bit font.
+        name (string): Font name to print.
+        rounds (Optional int): Times every letter is rendered (default 5).
+        color (Optional int): RGB565 color value (default white).
+        background (Optional int): RGB565 background color (default black).
+    Returns:
+        bool: True if both rasterizers drew every letter the same.
+    """
+    letters = [chr(c) for c in range(font.start_letter + 1,
+                                     font.start_letter + font.letter_count)]
+    budget = font.cache_budget
+    font.clear_cache()
+    font.cache_budget = 0
+    same = True
+    for landscape in (False, True):
+        for letter in letters:
+            expected = reference_letter(font, letter, color, background,
+                                        landscape)[0]
+            if font.get_letter(letter, color, background,
+                               landscape)[0] != expected:
+                print('{0}: {1!r} differs'.format(name, letter))
+                same = False
+        rates = []
+        for rasterize in (reference_letter, XglcdFont.get_letter):
+            start = ticks_us()
+            for _ in range(rounds):
+                for letter in letters:
+                    rasterize(font, letter, color, background, landscape)
+            elapsed = max(ticks_diff(ticks_us(), start), 1)
+            rates.append(rounds * len(letters) * 1000000 // elapsed)
+        print('{0} {1}: {2} -> {3} glyphs/s'.format(
+            name, 'landscape' if landscape else 'portrait', *rates))
+    font.cache_budget = budget
+    return same
+
+
+def main(rounds=5):
+    """Benchmark the Monogram fonts.
+
+    Args:
+        rounds (Optional int): Times every letter is rendered (default 5).
+    """
+    for path, width, height in FONTS:
+        name = path.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        benchmark(XglcdFont(path, width, height), name, rounds)
+
+
+if __name__ == '__main__':
+    main(30)
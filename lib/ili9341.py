@@ -1,9 +1,13 @@
 """ILI9341 LCD/Touch module."""
+import asyncio
+from array import array
 from time import sleep
-from math import cos, sin, pi, radians
+from math import sin, radians
 from sys import implementation
-from framebuf import FrameBuffer, RGB565  # type: ignore
-from lib.xglcd_font import XglcdFont
+from framebuf import FrameBuffer, MONO_HMSB, RGB565  # type: ignore
+from lib.buffer_pool import BufferPool
+from lib.rle_image import read_header, decode_rows, FORMAT_RLE
+from lib.xglcd_font import XglcdFont, bit_table
 from micropython import const  # type: ignore
 
 
@@ -18,6 +22,82 @@ def color565(r, g, b):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
 
+# Sine of every whole degree in 2.14 fixed point
+SIN_TABLE = array('h', [round(sin(radians(d)) * 16384) for d in range(360)])
+
+
+def sin_fixed(angle):
+    """Return sine of an angle in 2.14 fixed point.
+
+    Args:
+        angle (int): Angle in degrees (rounded to a whole degree).
+    """
+    return SIN_TABLE[round(angle) % 360]
+
+
+def cos_fixed(angle):
+    """Return cosine of an angle in 2.14 fixed point.
+
+    Args:
+        angle (int): Angle in degrees (rounded to a whole degree).
+    """
+    return SIN_TABLE[(round(angle) + 90) % 360]
+
+
+def opaque_runs(buf, w, h, key):
+    """Find the runs of pixels that are not the transparent color.
+
+    Args:
+        buf (bytes): Big endian RGB565 pixels (w * h * 2 bytes).
+        w (int): Width of sprite.
+        h (int): Height of sprite.
+        key (int): RGB565 color to treat as transparent (-1 = opaque).
+    Returns:
+        [[(int, int)]]: For each row, start and end (exclusive) pixel of
+            every opaque run.
+    """
+    if key == -1:
+        return [[(0, w)]] * h
+    hi = key >> 8
+    lo = key & 0xFF
+    rows = []
+    for y in range(h):
+        runs = []
+        start = -1
+        i = y * w * 2
+        for x in range(w):
+            if buf[i] == hi and buf[i + 1] == lo:
+                if start != -1:
+                    runs.append((start, x))
+                    start = -1
+            elif start == -1:
+                start = x
+            i += 2
+        if start != -1:
+            runs.append((start, w))
+        rows.append(runs)
+    return rows
+
+
+def transform_coords(coords, angle=0, x0=0, y0=0):
+    """Rotate coordinates around the origin then move them to a point.
+
+    Args:
+        coords ([[int, int],...]): X, Y pairs relative to the origin.
+        angle (Optional int): Rotation in degrees (default 0).
+        x0, y0 (Optional int): Point the origin is moved to (default 0, 0).
+    Returns:
+        [[int, int],...]: Transformed X, Y pairs.
+    Note:
+        Uses the fixed point sine table, so no floating point math is done
+        per point.  Handy for gauge needles and arrows.
+    """
+    c = cos_fixed(angle)
+    s = sin_fixed(angle)
+    return [[x0 + ((x * c - y * s + 8192) >> 14),
+             y0 + ((x * s + y * c + 8192) >> 14)] for x, y in coords]
+
+
 class Display(object):
     """Serial interface for 16-bit color (5-6-5 RGB) IL9341 display.
 
@@ -52,6 +132,7 @@ class Display(object):
     MADCTL = const(0x36)  # Memory access control
     VSCRSADD = const(0x37)  # Vertical scrolling start address
     PIXFMT = const(0x3A)  # COLMOD: Pixel format set
+    WRITE_RAM_CONTINUE = const(0x3C)  # Memory write continue
     WRITE_DISPLAY_BRIGHTNESS = const(0x51)  # Brightness hardware dependent!
     READ_DISPLAY_BRIGHTNESS = const(0x52)
     WRITE_CTRL_DISPLAY = const(0x53)
@@ -90,8 +171,11 @@ class Display(object):
         270: 0x28
     }
 
+    # Number of color pairs with a cached 8x8 font expansion table (4 KB each)
+    TEXT8X8_TABLES = 2
+
     def __init__(self, spi, cs, dc, rst, width=240, height=320, rotation=0,
-                 bgr=True, gamma=True):
+                 bgr=True, gamma=True, debug=True):
         """Initialize OLED.
 
         Args:
@@ -104,6 +188,7 @@ class Display(object):
             rotation (Optional int): Rotation must be 0 default, 90. 180 or 270
             bgr (Optional bool): Swaps red and blue colors (default True)
             gamma (Optional bool): Custom gamma correction (default True)
+            debug (Optional bool): Print diagnostic messages (default True)
         """
         self.spi = spi
         self.cs = cs
@@ -111,6 +196,13 @@ class Display(object):
         self.rst = rst
         self.width = width
         self.height = height
+        self.debug = debug
+        # Current clip rectangle (inclusive) and saved clip rectangles
+        self.clip_x0 = 0
+        self.clip_y0 = 0
+        self.clip_x1 = width - 1
+        self.clip_y1 = height - 1
+        self.clip_stack = []
         if rotation not in self.ROTATE.keys():
             raise RuntimeError('Rotation must be 0, 90, 180 or 270.')
         else:
@@ -118,6 +210,23 @@ class Display(object):
             if not bgr:  # Clear BGR bit
                 self.rotation &= 0b11110111
 
+        # Last column/page window sent to the panel (None = unknown)
+        self.window_column = None
+        self.window_page = None
+        # Number of column/page address commands skipped by block()
+        self.window_skips = 0
+        # Preallocated address argument buffers for block()
+        self.column_buf = bytearray(4)
+        self.page_buf = bytearray(4)
+        # Serializes asynchronous transfers (see block_async)
+        self.transfer_lock = asyncio.Lock()
+        # Scratch and solid color buffers reused by the primitives
+        self.pool = BufferPool()
+        # Built-in 8x8 font as bits (see text8x8_table)
+        self.text8x8_atlas = None
+        self.text8x8_tables = {}
+        self.text8x8_order = []
+
         # Initialize GPIO pins and set implementation specific methods
         if implementation.name == 'circuitpython':
             self.cs.switch_to_output(value=True)
@@ -126,6 +235,7 @@ class Display(object):
             self.reset = self.reset_cpy
             self.write_cmd = self.write_cmd_cpy
             self.write_data = self.write_data_cpy
+            self.block = self.block_cpy
         else:
             self.cs.init(self.cs.OUT, value=1)
             self.dc.init(self.dc.OUT, value=0)
@@ -133,6 +243,7 @@ class Display(object):
             self.reset = self.reset_mpy
             self.write_cmd = self.write_cmd_mpy
             self.write_data = self.write_data_mpy
+            self.block = self.block_mpy
         self.reset()
         # Send initialization commands
         self.write_cmd(self.SWRESET)  # Software reset
@@ -167,8 +278,36 @@ class Display(object):
         sleep(.1)
         self.clear()
 
-    def block(self, x0, y0, x1, y1, data):
-        """Write a block of data to display.
+    def address_map(self, madctl):
+        """Return how a MADCTL address mode maps onto panel memory.
+
+        Args:
+            madctl (int): MADCTL value.
+        Returns:
+            (int, int, int, int, int, int): a, b, c, d, ox, oy such that
+                window position x, y is written to memory column
+                a * x + b * y + ox and page c * x + d * y + oy.
+        Note:
+            MV exchanges rows and columns, then MX and MY reverse the
+            column and page order of the native 240x320 memory.
+        """
+        if self.rotation & 0x20:
+            native_w, native_h = self.height, self.width
+        else:
+            native_w, native_h = self.width, self.height
+        if madctl & 0x20:
+            a, b, c, d = 0, 1, 1, 0
+        else:
+            a, b, c, d = 1, 0, 0, 1
+        ox = oy = 0
+        if madctl & 0x40:
+            a, b, ox = -a, -b, native_w - 1
+        if madctl & 0x80:
+            c, d, oy = -c, -d, native_h - 1
+        return a, b, c, d, ox, oy
+
+    def block_mpy(self, x0, y0, x1, y1, data):
+        """Write a block of data to display (MicroPython).
 
         Args:
             x0 (int):  Starting X position.
@@ -176,13 +315,148 @@ class Display(object):
             x1 (int):  Ending X position.
             y1 (int):  Ending Y position.
             data (bytes): Data buffer to write.
+        Notes:
+            The column and page addresses are only sent when they differ
+            from the last window, and CS stays low for the whole sequence.
         """
-        self.write_cmd(self.SET_COLUMN,
-                       x0 >> 8, x0 & 0xff, x1 >> 8, x1 & 0xff)
-        self.write_cmd(self.SET_PAGE,
-                       y0 >> 8, y0 & 0xff, y1 >> 8, y1 & 0xff)
-        self.write_cmd(self.WRITE_RAM)
-        self.write_data(data)
+        spi = self.spi
+        dc = self.dc
+        self.cs(0)
+        column = (x0 << 16) | x1
+        if column != self.window_column:
+            buf = self.column_buf
+            buf[0] = x0 >> 8
+            buf[1] = x0 & 0xff
+            buf[2] = x1 >> 8
+            buf[3] = x1 & 0xff
+            dc(0)
+            spi.write(b'\x2a')  # SET_COLUMN
+            dc(1)
+            spi.write(buf)
+            self.window_column = column
+        else:
+            self.window_skips += 1
+        page = (y0 << 16) | y1
+        if page != self.window_page:
+            buf = self.page_buf
+            buf[0] = y0 >> 8
+            buf[1] = y0 & 0xff
+            buf[2] = y1 >> 8
+            buf[3] = y1 & 0xff
+            dc(0)
+            spi.write(b'\x2b')  # SET_PAGE
+            dc(1)
+            spi.write(buf)
+            self.window_page = page
+        else:
+            self.window_skips += 1
+        dc(0)
+        spi.write(b'\x2c')  # WRITE_RAM
+        dc(1)
+        spi.write(data)
+        self.cs(1)
+
+    def block_cpy(self, x0, y0, x1, y1, data):
+        """Write a block of data to display (CircuitPython).
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        Notes:
+            The column and page addresses are only sent when they differ
+            from the last window, and CS stays low for the whole sequence.
+        """
+        spi = self.spi
+        dc = self.dc
+        self.cs.value = False
+        # Confirm SPI locked before writing
+        while not spi.try_lock():
+            pass
+        column = (x0 << 16) | x1
+        if column != self.window_column:
+            buf = self.column_buf
+            buf[0] = x0 >> 8
+            buf[1] = x0 & 0xff
+            buf[2] = x1 >> 8
+            buf[3] = x1 & 0xff
+            dc.value = False
+            spi.write(b'\x2a')  # SET_COLUMN
+            dc.value = True
+            spi.write(buf)
+            self.window_column = column
+        else:
+            self.window_skips += 1
+        page = (y0 << 16) | y1
+        if page != self.window_page:
+            buf = self.page_buf
+            buf[0] = y0 >> 8
+            buf[1] = y0 & 0xff
+            buf[2] = y1 >> 8
+            buf[3] = y1 & 0xff
+            dc.value = False
+            spi.write(b'\x2b')  # SET_PAGE
+            dc.value = True
+            spi.write(buf)
+            self.window_page = page
+        else:
+            self.window_skips += 1
+        dc.value = False
+        spi.write(b'\x2c')  # WRITE_RAM
+        dc.value = True
+        spi.write(data)
+        spi.unlock()
+        self.cs.value = True
+
+    async def block_async(self, x0, y0, x1, y1, data, chunk_size=4096):
+        """Write a block of data to display without stalling the event loop.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+            chunk_size (Optional int): Bytes sent between yields
+                (default 4096).
+        Notes:
+            MicroPython's machine.SPI has no DMA or non-blocking write, so
+            the payload is shifted out in bounded chunks with the event loop
+            running other tasks in between.  Chunks after the first use
+            WRITE_RAM_CONTINUE so the panel keeps its write position.
+            Asynchronous transfers are serialized by transfer_lock, but
+            synchronous drawing from another task during a transfer will
+            still corrupt it.
+        """
+        mv = memoryview(data)
+        size = len(mv)
+        async with self.transfer_lock:
+            self.block(x0, y0, x1, y1, mv[:chunk_size])
+            offset = chunk_size
+            while offset < size:
+                await asyncio.sleep(0)
+                self.write_cmd(self.WRITE_RAM_CONTINUE)
+                self.write_data(mv[offset:offset + chunk_size])
+                offset += chunk_size
+
+    def clip_rect(self, x, y, w, h):
+        """Clip a rectangle to the current clip rectangle.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+        Returns:
+            (int, int, int, int): Clipped x, y, w, h (w or h <= 0 if hidden).
+        """
+        x2 = min(x + w, self.clip_x1 + 1)
+        y2 = min(y + h, self.clip_y1 + 1)
+        x = max(x, self.clip_x0)
+        y = max(y, self.clip_y0)
+        return x, y, x2 - x, y2 - y
 
     def cleanup(self):
         """Clean up resources."""
@@ -210,13 +484,29 @@ class Display(object):
         assert hlines > 0 and h % hlines == 0, (
             "hlines must be a non-zero factor of height.")
         # Clear display
-        if color:
-            line = color.to_bytes(2, 'big') * (w * hlines)
-        else:
-            line = bytearray(w * 2 * hlines)
+        line = self.pool.fill(color, w * 2 * hlines)
         for y in range(0, h, hlines):
             self.block(0, y, w - 1, y + hlines - 1, line)
 
+    async def clear_async(self, color=0, hlines=8):
+        """Clear display, yielding to the event loop between chunks.
+
+        Args:
+            color (Optional int): RGB565 color value (Default: 0 = Black).
+            hlines (Optional int): # of horizontal lines per chunk (Default: 8)
+        Note:
+            See clear() for valid hlines values.
+        """
+        w = self.width
+        h = self.height
+        assert hlines > 0 and h % hlines == 0, (
+            "hlines must be a non-zero factor of height.")
+        line = self.pool.fill(color, w * 2 * hlines)
+        async with self.transfer_lock:
+            for y in range(0, h, hlines):
+                self.block(0, y, w - 1, y + hlines - 1, line)
+                await asyncio.sleep(0)
+
     def display_off(self):
         """Turn display off."""
         self.write_cmd(self.DISPLAY_OFF)
@@ -233,32 +523,31 @@ class Display(object):
             y0 (int): Y coordinate of center point.
             r (int): Radius.
             color (int): RGB565 color value.
+        Note:
+            Pixels of the first octant are grouped into runs sharing a row,
+            and each run is mirrored into the other octants as horizontal
+            and vertical lines (one block per run).
         """
         f = 1 - r
         dx = 1
         dy = -r - r
         x = 0
         y = r
-        self.draw_pixel(x0, y0 + r, color)
-        self.draw_pixel(x0, y0 - r, color)
-        self.draw_pixel(x0 + r, y0, color)
-        self.draw_pixel(x0 - r, y0, color)
+        run_start = 0
         while x < y:
             if f >= 0:
+                # Row is about to change so draw the finished run
+                self.draw_mirrored_span(x0, y0, y, run_start, x, color)
+                self.draw_mirrored_span(x0, y0, y, run_start, x, color, True)
+                run_start = x + 1
                 y -= 1
                 dy += 2
                 f += dy
             x += 1
             dx += 2
             f += dx
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
-            self.draw_pixel(x0 + y, y0 + x, color)
-            self.draw_pixel(x0 - y, y0 + x, color)
-            self.draw_pixel(x0 + y, y0 - x, color)
-            self.draw_pixel(x0 - y, y0 - x, color)
+        self.draw_mirrored_span(x0, y0, y, run_start, x, color)
+        self.draw_mirrored_span(x0, y0, y, run_start, x, color, True)
 
     def draw_ellipse(self, x0, y0, a, b, color):
         """Draw an ellipse.
@@ -273,6 +562,8 @@ class Display(object):
             Since pixels are not divisible, the axes are integer rounded
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
+            Region 1 is drawn as horizontal runs and region 2 as vertical
+            runs, mirrored into all four quadrants.
         """
         a2 = a * a
         b2 = b * b
@@ -282,12 +573,8 @@ class Display(object):
         y = b
         px = 0
         py = twoa2 * y
-        # Plot initial points
-        self.draw_pixel(x0 + x, y0 + y, color)
-        self.draw_pixel(x0 - x, y0 + y, color)
-        self.draw_pixel(x0 + x, y0 - y, color)
-        self.draw_pixel(x0 - x, y0 - y, color)
-        # Region 1
+        # Region 1 (runs of pixels sharing a row)
+        run_start = 0
         p = round(b2 - (a2 * b) + (0.25 * a2))
         while px < py:
             x += 1
@@ -295,14 +582,14 @@ class Display(object):
             if p < 0:
                 p += b2 + px
             else:
+                self.draw_mirrored_span(x0, y0, y, run_start, x - 1, color)
+                run_start = x
                 y -= 1
                 py -= twoa2
                 p += b2 + px - py
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
-        # Region 2
+        self.draw_mirrored_span(x0, y0, y, run_start, x, color)
+        # Region 2 (runs of pixels sharing a column)
+        run_end = y - 1
         p = round(b2 * (x + 0.5) * (x + 0.5) +
                   a2 * (y - 1) * (y - 1) - a2 * b2)
         while y > 0:
@@ -311,13 +598,15 @@ class Display(object):
             if p > 0:
                 p += a2 - py
             else:
+                if run_end > y:
+                    self.draw_mirrored_span(x0, y0, x, y + 1, run_end,
+                                            color, True)
+                run_end = y
                 x += 1
                 px += twob2
                 p += a2 - py + px
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
+        if run_end >= y:
+            self.draw_mirrored_span(x0, y0, x, y, run_end, color, True)
 
     def draw_hline(self, x, y, w, color):
         """Draw a horizontal line.
@@ -328,12 +617,17 @@ class Display(object):
             w (int): Width of line.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y):
+        if y < self.clip_y0 or y > self.clip_y1:
             return
-        line = color.to_bytes(2, 'big') * w
-        self.block(x, y, x + w - 1, y, line)
+        x2 = min(x + w - 1, self.clip_x1)
+        x = max(x, self.clip_x0)
+        if x > x2:
+            return
+        line = self.pool.fill(color, (x2 - x + 1) * 2)
+        self.block(x, y, x2, y, line)
 
-    def draw_image(self, path, x=0, y=0, w=320, h=240):
+    def draw_image(self, path, x=0, y=0, w=320, h=240, chunk_size=4096,
+                   scale=1):
         """Draw image from flash.
 
         Args:
@@ -342,28 +636,157 @@ class Display(object):
             y (int): Y coordinate of image top.  Default is 0.
             w (int): Width of image.  Default is 320.
             h (int): Height of image.  Default is 240.
+            chunk_size (int): Bytes read per chunk.  Default is 4096.
+            scale (int): Integer magnification (see draw_sprite_scaled).
+                Default is 1.
         """
-        x2 = x + w - 1
-        y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
+        x2 = x + w * scale - 1
+        vy0 = max(y, self.clip_y0)
+        vy1 = min(y + h * scale - 1, self.clip_y1)
+        if vy0 > vy1 or x > self.clip_x1 or x2 < self.clip_x0:
+            return
+        # Only read the visible rows
+        row0 = (vy0 - y) // scale
+        row1 = (vy1 - y) // scale
+        with open(path, "rb") as f:
+            f.seek(row0 * w * 2)
+            chunk_y = y + row0 * scale
+            for buf, rows in self.read_image_rows(f, w, row1 - row0 + 1,
+                                                  chunk_size):
+                self.draw_sprite(buf, x, chunk_y, w, rows, scale=scale)
+                chunk_y += rows * scale
+
+    async def draw_image_async(self, path, x=0, y=0, w=320, h=240,
+                               chunk_size=4096, scale=1):
+        """Draw image from flash, yielding to the event loop between chunks.
+
+        Args:
+            path (string): Image file path.
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            w (int): Width of image.  Default is 320.
+            h (int): Height of image.  Default is 240.
+            chunk_size (int): Bytes read per chunk.  Default is 4096.
+            scale (int): Integer magnification (see draw_sprite_scaled).
+                Default is 1.
+        """
+        x2 = x + w * scale - 1
+        vy0 = max(y, self.clip_y0)
+        vy1 = min(y + h * scale - 1, self.clip_y1)
+        if vy0 > vy1 or x > self.clip_x1 or x2 < self.clip_x0:
+            return
+        row0 = (vy0 - y) // scale
+        row1 = (vy1 - y) // scale
+        async with self.transfer_lock:
+            with open(path, "rb") as f:
+                f.seek(row0 * w * 2)
+                chunk_y = y + row0 * scale
+                for buf, rows in self.read_image_rows(f, w, row1 - row0 + 1,
+                                                      chunk_size):
+                    self.draw_sprite(buf, x, chunk_y, w, rows, scale=scale)
+                    chunk_y += rows * scale
+                    await asyncio.sleep(0)
+
+    def draw_image_region(self, path, src_x, src_y, w, h, dst_x, dst_y,
+                          src_width, chunk_size=4096):
+        """Draw part of a raw image from flash.
+
+        Args:
+            path (string): Image file path.
+            src_x (int): X coordinate of the region in the image.
+            src_y (int): Y coordinate of the region in the image.
+            w (int): Width of region.
+            h (int): Height of region.
+            dst_x (int): X coordinate of region left on screen.
+            dst_y (int): Y coordinate of region top on screen.
+            src_width (int): Width of the whole image.
+            chunk_size (int): Bytes read per chunk.  Default is 4096.
+        Note:
+            Only the visible part of the region is read, so images larger
+            than the screen can be shown a piece at a time.
+        """
+        vx0 = max(dst_x, self.clip_x0)
+        vy0 = max(dst_y, self.clip_y0)
+        vx1 = min(dst_x + w - 1, self.clip_x1)
+        vy1 = min(dst_y + h - 1, self.clip_y1)
+        if vx0 > vx1 or vy0 > vy1:
             return
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
+            chunk_y = vy0
+            for buf, rows in self.read_image_region(
+                    f, src_x + vx0 - dst_x, src_y + vy0 - dst_y,
+                    vx1 - vx0 + 1, vy1 - vy0 + 1, src_width, chunk_size):
+                self.block(vx0, chunk_y, vx1, chunk_y + rows - 1, buf)
+                chunk_y += rows
+
+    def draw_rle_image(self, path, x=0, y=0, chunk_size=4096):
+        """Draw a run-length encoded image from flash.
+
+        Args:
+            path (string): RL16 image file path (see lib/rle_image.py).
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            chunk_size (int): Bytes decoded per block.  Default is 4096.
+        Returns:
+            (int, int): Image width and height.
+        """
+        with open(path, "rb") as f:
+            w, h, rows = self.read_rle_rows(f, chunk_size)
             chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.block(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.block(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            for buf, n in rows:
+                self.draw_sprite(buf, x, chunk_y, w, n)
+                chunk_y += n
+        return w, h
+
+    async def draw_rle_image_async(self, path, x=0, y=0, chunk_size=4096):
+        """Draw a run-length encoded image, yielding between chunks.
+
+        Args:
+            path (string): RL16 image file path (see lib/rle_image.py).
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            chunk_size (int): Bytes decoded per block.  Default is 4096.
+        Returns:
+            (int, int): Image width and height.
+        """
+        async with self.transfer_lock:
+            with open(path, "rb") as f:
+                w, h, rows = self.read_rle_rows(f, chunk_size)
+                chunk_y = y
+                for buf, n in rows:
+                    self.draw_sprite(buf, x, chunk_y, w, n)
+                    chunk_y += n
+                    await asyncio.sleep(0)
+        return w, h
+
+    def draw_indexed_sprite(self, sprite, x, y):
+        """Draw a palette indexed sprite.
+
+        Args:
+            sprite (IndexedSprite): Sprite to draw.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+        Note:
+            Rows are expanded through the sprite's lookup table into scratch
+            slot 6 a chunk at a time.  Rows outside the clip rectangle are
+            not expanded.
+        """
+        w = sprite.width
+        if x > self.clip_x1 or x + w - 1 < self.clip_x0:
+            return
+        row = max(0, self.clip_y0 - y)
+        end = min(sprite.height, self.clip_y1 - y + 1)
+        if row >= end:
+            return
+        stride = w * 2
+        chunk_rows = min(max(2048 // stride, 1), end - row)
+        buf = self.pool.scratch(chunk_rows * stride +
+                                sprite.pixels_per_byte * 2,  6)
+        while row < end:
+            n = min(chunk_rows, end - row)
+            sprite.expand_rows(buf, row, n)
+            self.draw_sprite(buf[:n * stride], x, y + row, w, n)
+            row += n
 
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False, rotate_180=False):
@@ -379,38 +802,18 @@ class Display(object):
             landscape (bool): Orientation (default: False = portrait)
             rotate_180 (bool): Rotate text by 180 degrees
         """
-        buf, w, h = font.get_letter(letter, color, background, landscape)
-        if rotate_180:
-            # Manually rotate the buffer by 180 degrees
-            # ensure bytes pairs for each pixel retain color565
-            new_buf = bytearray(len(buf))
-            num_pixels = len(buf) // 2
-            for i in range(num_pixels):
-                # The index for the new buffer's byte pair
-                new_idx = (num_pixels - 1 - i) * 2
-                # The index for the original buffer's byte pair
-                old_idx = i * 2
-                # Swap the pixels
-                new_buf[new_idx], new_buf[new_idx + 1] = buf[old_idx], buf[old_idx + 1]
-            buf = new_buf
-
+        buf, w, h = font.get_letter(letter, color, background, landscape,
+                                    self.pool)
         # Check for errors (Font could be missing specified letter)
         if w == 0:
             return w, h
 
+        # The panel reverses the scan order for 180 degree letters
+        rotate = 180 if rotate_180 else 0
         if landscape:
-            y -= w
-            if self.is_off_grid(x, y, x + h - 1, y + w - 1):
-                return 0, 0
-            self.block(x, y,
-                       x + h - 1, y + w - 1,
-                       buf)
+            self.draw_sprite(buf, x, y - w, h, w, rotate)
         else:
-            if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-                return 0, 0
-            self.block(x, y,
-                       x + w - 1, y + h - 1,
-                       buf)
+            self.draw_sprite(buf, x, y, w, h, rotate)
         return w, h
 
     def draw_letter_manual(self, x, y, letter:str, font:XglcdFont, color, background=0,
@@ -484,9 +887,9 @@ class Display(object):
                 y1, y2 = y2, y1
             self.draw_vline(x1, y1, y2 - y1 + 1, color)
             return
-        # Confirm coordinates in boundary
-        if self.is_off_grid(min(x1, x2), min(y1, y2),
-                            max(x1, x2), max(y1, y2)):
+        # Skip lines entirely outside the clip rectangle
+        if (max(x1, x2) < self.clip_x0 or min(x1, x2) > self.clip_x1 or
+                max(y1, y2) < self.clip_y0 or min(y1, y2) > self.clip_y1):
             return
         # Changes in x, y
         dx = x2 - x1
@@ -508,16 +911,24 @@ class Display(object):
         error = dx >> 1
         ystep = 1 if y1 < y2 else -1
         y = y1
+        dy = abs(dy)
+        # Pixels sharing a row (or column when steep) are drawn as one run
+        run_start = x1
         for x in range(x1, x2 + 1):
-            # Had to reverse HW ????
-            if not is_steep:
-                self.draw_pixel(x, y, color)
-            else:
-                self.draw_pixel(y, x, color)
-            error -= abs(dy)
+            error -= dy
             if error < 0:
+                if not is_steep:
+                    self.draw_hline(run_start, y, x - run_start + 1, color)
+                else:
+                    self.draw_vline(y, run_start, x - run_start + 1, color)
+                run_start = x + 1
                 y += ystep
                 error += dx
+        if run_start <= x2:
+            if not is_steep:
+                self.draw_hline(run_start, y, x2 - run_start + 1, color)
+            else:
+                self.draw_vline(y, run_start, x2 - run_start + 1, color)
 
     def draw_lines(self, coords, color):
         """Draw multiple lines.
@@ -534,6 +945,33 @@ class Display(object):
             self.draw_line(x1, y1, x2, y2, color)
             x1, y1 = x2, y2
 
+    def draw_mirrored_span(self, x0, y0, offset, start, end, color,
+                           vertical=False):
+        """Draw a run of pixels mirrored around a center point.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            offset (int): Row (or column if vertical) offset from center.
+            start (int): Run start offset along the run direction.
+            end (int): Run end offset along the run direction.
+            color (int): RGB565 color value.
+            vertical (Optional bool): Draw vertical runs (default False).
+        Note:
+            Draws up to four runs (both sides of the center on both mirrored
+            rows or columns).  Runs starting on the axis are merged.
+        """
+        length = end - start + 1
+        if start == 0:
+            runs = ((-end, end + end + 1),)
+        else:
+            runs = ((start, length), (-end, length))
+        for b in ((offset, -offset) if offset else (0,)):
+            for a, n in runs:
+                if vertical:
+                    self.draw_vline(x0 + b, y0 + a, n, color)
+                else:
+                    self.draw_hline(x0 + a, y0 + b, n, color)
+
     def draw_pixel(self, x, y, color):
         """Draw a single pixel.
 
@@ -542,9 +980,10 @@ class Display(object):
             y (int): Y position.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x, y):
+        if (x < self.clip_x0 or x > self.clip_x1 or
+                y < self.clip_y0 or y > self.clip_y1):
             return
-        self.block(x, y, x, y, color.to_bytes(2, 'big'))
+        self.block(x, y, x, y, self.pool.fill(color, 2))
 
     def draw_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw an n-sided regular polygon.
@@ -560,14 +999,8 @@ class Display(object):
             Since pixels are not divisible, the radius is integer rounded
             up to complete on a full pixel.  Therefore diameter = 2 x r + 1.
         """
-        coords = []
-        theta = radians(rotate)
-        n = sides + 1
-        for s in range(n):
-            t = 2.0 * pi * s / sides + theta
-            coords.append([int(r * cos(t) + x0), int(r * sin(t) + y0)])
-
-        # Cast to python float first to fix rounding errors
+        coords = self.polygon_coords(sides, x0, y0, r, rotate)
+        coords.append(coords[0])
         self.draw_lines(coords, color=color)
 
     def draw_rectangle(self, x, y, w, h, color):
@@ -587,7 +1020,8 @@ class Display(object):
         self.draw_vline(x, y, h, color)
         self.draw_vline(x2, y, h, color)
 
-    def draw_sprite(self, buf, x, y, w, h):
+    def draw_sprite(self, buf, x, y, w, h, rotate=0, mirror_x=False,
+                    mirror_y=False, scale=1):
         """Draw a sprite (optimized for horizontal drawing).
 
         Args:
@@ -596,15 +1030,267 @@ class Display(object):
             y (int): Starting Y position.
             w (int): Width of drawing.
             h (int): Height of drawing.
+            rotate (Optional int): Clockwise rotation 0, 90, 180 or 270
+                (applied after mirroring).
+            mirror_x (Optional bool): Flip the sprite left to right.
+            mirror_y (Optional bool): Flip the sprite top to bottom.
+            scale (Optional int): Integer magnification (default 1, see
+                draw_sprite_scaled).
+        Note:
+            Sprites are clipped to the clip rectangle.  Only the visible
+            rows and columns are sent.  x and y are the top left corner of
+            the transformed sprite, which is h wide and w high when rotated
+            by 90 or 270.  Transforms are done by the panel (see
+            draw_sprite_transformed).
         """
+        if scale != 1:
+            if rotate or mirror_x or mirror_y:
+                raise ValueError(
+                    'Scaled sprites cannot be rotated or mirrored.')
+            self.draw_sprite_scaled(buf, x, y, w, h, scale)
+            return
+        if rotate or mirror_x or mirror_y:
+            self.draw_sprite_transformed(buf, x, y, w, h, rotate, mirror_x,
+                                         mirror_y)
+            return
         x2 = x + w - 1
         y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
+        cx0 = self.clip_x0
+        cy0 = self.clip_y0
+        cx1 = self.clip_x1
+        cy1 = self.clip_y1
+        if x >= cx0 and y >= cy0 and x2 <= cx1 and y2 <= cy1:
+            self.block(x, y, x2, y2, buf)
+            return
+        vx0 = max(x, cx0)
+        vy0 = max(y, cy0)
+        vx1 = min(x2, cx1)
+        vy1 = min(y2, cy1)
+        if vx0 > vx1 or vy0 > vy1:
+            return
+        mv = memoryview(buf)
+        stride = w * 2
+        offset = (vy0 - y) * stride
+        if vx0 == x and vx1 == x2:
+            # Full rows are contiguous in the sprite
+            self.block(x, vy0, x2, vy1,
+                       mv[offset:offset + (vy1 - vy0 + 1) * stride])
+            return
+        # Copy the visible columns of each row into a chunk buffer
+        offset += (vx0 - x) * 2
+        row_bytes = (vx1 - vx0 + 1) * 2
+        chunk_rows = min(max(2048 // row_bytes, 1), vy1 - vy0 + 1)
+        chunk = self.pool.scratch(chunk_rows * row_bytes)
+        row = vy0
+        while row <= vy1:
+            n = min(chunk_rows, vy1 - row + 1)
+            pos = 0
+            for _ in range(n):
+                chunk[pos:pos + row_bytes] = mv[offset:offset + row_bytes]
+                pos += row_bytes
+                offset += stride
+            self.block(vx0, row, vx1, row + n - 1, chunk[:pos])
+            row += n
+
+    def draw_sprite_runs(self, buf, x, y, w, h, runs):
+        """Draw a sprite with transparent pixels.
+
+        Args:
+            buf (bytearray): Buffer to draw.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of drawing.
+            h (int): Height of drawing.
+            runs ([[(int, int)]]): Opaque runs of every row (see
+                opaque_runs).
+        Note:
+            Only the opaque runs are sent, one block each, so transparent
+            pixels keep what is on the panel.  Consecutive fully opaque
+            rows are contiguous in the sprite and sent as one block.
+        """
+        cx0 = self.clip_x0
+        cx1 = self.clip_x1
+        vy0 = max(y, self.clip_y0)
+        vy1 = min(y + h - 1, self.clip_y1)
+        if vy0 > vy1 or x > cx1 or x + w - 1 < cx0:
+            return
+        mv = memoryview(buf)
+        stride = w * 2
+        full = [(0, w)]
+        row = vy0 - y
+        last = vy1 - y
+        while row <= last:
+            if runs[row] == full:
+                end = row
+                while end < last and runs[end + 1] == full:
+                    end += 1
+                self.draw_sprite(mv[row * stride:(end + 1) * stride],
+                                 x, y + row, w, end - row + 1)
+                row = end + 1
+                continue
+            for start, end in runs[row]:
+                x0 = max(x + start, cx0)
+                x1 = min(x + end - 1, cx1)
+                if x0 <= x1:
+                    offset = row * stride + (x0 - x) * 2
+                    self.block(x0, y + row, x1, y + row,
+                               mv[offset:offset + (x1 - x0 + 1) * 2])
+            row += 1
+
+    def draw_sprite_scaled(self, buf, x, y, w, h, scale, chunk_size=4096):
+        """Draw a sprite magnified by pixel replication.
+
+        Args:
+            buf (bytearray): Buffer to draw.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of the sprite data.
+            h (int): Height of the sprite data.
+            scale (int): Integer magnification (1 or more), the sprite
+                covers w * scale by h * scale pixels.
+            chunk_size (Optional int): Maximum bytes sent per block
+                (default 4096).
+        Note:
+            Each visible source row is expanded once into a chunk buffer
+            (scratch slot 0) and copied for the rows it covers, so only
+            the small source is held in memory.
+        """
+        if scale < 1:
+            raise ValueError('Scale must be 1 or more.')
+        vx0 = max(x, self.clip_x0)
+        vy0 = max(y, self.clip_y0)
+        vx1 = min(x + w * scale - 1, self.clip_x1)
+        vy1 = min(y + h * scale - 1, self.clip_y1)
+        if vx0 > vx1 or vy0 > vy1:
+            return
+        mv = memoryview(buf)
+        stride = w * 2
+        row_bytes = (vx1 - vx0 + 1) * 2
+        chunk_rows = min(max(chunk_size // row_bytes, scale), vy1 - vy0 + 1)
+        chunk = self.pool.scratch(chunk_rows * row_bytes)
+        first = (vx0 - x) // scale
+        # Screen columns covered by the first (possibly clipped) pixel
+        first_n = min(x + (first + 1) * scale, vx1 + 1) - vx0
+        pos = 0
+        top = vy0
+        sy = vy0
+        while sy <= vy1:
+            r = (sy - y) // scale
+            n = min(y + (r + 1) * scale, vy1 + 1) - sy
+            if pos + n * row_bytes > chunk_rows * row_bytes:
+                self.block(vx0, top, vx1, sy - 1, chunk[:pos])
+                pos = 0
+                top = sy
+            # Expand the visible part of source row r
+            i = r * stride + first * 2
+            line = pos
+            sx = vx0
+            count = first_n
+            while sx <= vx1:
+                b0 = mv[i]
+                b1 = mv[i + 1]
+                for _ in range(count):
+                    chunk[pos] = b0
+                    chunk[pos + 1] = b1
+                    pos += 2
+                sx += count
+                count = min(scale, vx1 + 1 - sx)
+                i += 2
+            # Repeat it for the other screen rows it covers
+            for _ in range(n - 1):
+                chunk[pos:pos + row_bytes] = chunk[line:line + row_bytes]
+                pos += row_bytes
+            sy += n
+        self.block(vx0, top, vx1, vy1, chunk[:pos])
+
+    def draw_sprite_transformed(self, buf, x, y, w, h, rotate=0,
+                                mirror_x=False, mirror_y=False):
+        """Draw a rotated and/or mirrored sprite using the panel's scan order.
+
+        Args:
+            buf (bytearray): Buffer to draw.
+            x (int): X position of the transformed sprite's left edge.
+            y (int): Y position of the transformed sprite's top edge.
+            w (int): Width of the sprite data.
+            h (int): Height of the sprite data.
+            rotate (Optional int): Clockwise rotation 0, 90, 180 or 270
+                (applied after mirroring).
+            mirror_x (Optional bool): Flip the sprite left to right.
+            mirror_y (Optional bool): Flip the sprite top to bottom.
+        Note:
+            MADCTL is switched to the address mode whose row/column order
+            matches the transform, the window is set in that mode's
+            coordinates and the data is sent unchanged, so the panel does
+            the rotation with no CPU copy.  The normal rotation is restored
+            afterwards.
+        """
+        ta, tb, tc, td, tx, ty = self.sprite_transform(x, y, w, h, rotate,
+                                                       mirror_x, mirror_y)
+        fw, fh = (h, w) if rotate % 180 else (w, h)
+        vx0 = max(x, self.clip_x0)
+        vy0 = max(y, self.clip_y0)
+        vx1 = min(x + fw - 1, self.clip_x1)
+        vy1 = min(y + fh - 1, self.clip_y1)
+        if vx0 > vx1 or vy0 > vy1:
             return
-        self.block(x, y, x2, y2, buf)
+        # Visible part of the sprite (the inverse is the transpose)
+        i0 = ta * (vx0 - tx) + tc * (vy0 - ty)
+        j0 = tb * (vx0 - tx) + td * (vy0 - ty)
+        i1 = ta * (vx1 - tx) + tc * (vy1 - ty)
+        j1 = tb * (vx1 - tx) + td * (vy1 - ty)
+        i0, i1 = min(i0, i1), max(i0, i1)
+        j0, j1 = min(j0, j1), max(j0, j1)
+        # Address mode with the combined sprite to panel memory order
+        ra, rb, rc, rd, rox, roy = self.address_map(self.rotation)
+        la = ra * ta + rb * tc
+        lb = ra * tb + rb * td
+        lc = rc * ta + rd * tc
+        ld = rc * tb + rd * td
+        for bits in range(8):
+            madctl = (self.rotation & 0x1F) | (bits << 5)
+            ma, mb, mc, md, mox, moy = self.address_map(madctl)
+            if (ma, mb, mc, md) == (la, lb, lc, ld):
+                break
+        mv = memoryview(buf)
+        stride = w * 2
+        cols = i1 - i0 + 1
+        row_bytes = cols * 2
+        if cols == w:
+            chunk_rows = j1 - j0 + 1
+        else:
+            chunk_rows = min(max(2048 // row_bytes, 1), j1 - j0 + 1)
+            chunk = self.pool.scratch(chunk_rows * row_bytes)
+        self.write_cmd(self.MADCTL, madctl)
+        self.invalidate_window()
+        row = j0
+        while row <= j1:
+            n = min(chunk_rows, j1 - row + 1)
+            offset = row * stride + i0 * 2
+            if cols == w:
+                data = mv[offset:offset + n * stride]
+            else:
+                pos = 0
+                for _ in range(n):
+                    chunk[pos:pos + row_bytes] = mv[offset:offset + row_bytes]
+                    pos += row_bytes
+                    offset += stride
+                data = chunk[:pos]
+            # Panel memory position of the chunk's first pixel
+            sx = ta * i0 + tb * row + tx
+            sy = tc * i0 + td * row + ty
+            px = ra * sx + rb * sy + rox - mox
+            py = rc * sx + rd * sy + roy - moy
+            # Same position in the transformed address mode
+            wx = ma * px + mc * py
+            wy = mb * px + md * py
+            self.block(wx, wy, wx + cols - 1, wy + n - 1, data)
+            row += n
+        self.write_cmd(self.MADCTL, self.rotation)
+        self.invalidate_window()
 
     def draw_text(self, x, y, text, font, color,  background=0,
-                  landscape=False, rotate_180=False, spacing=1):
+                  landscape=False, rotate_180=False, spacing=1,
+                  chunk_size=4096, scale=1):
         """Draw text.
 
         Args:
@@ -617,35 +1303,48 @@ class Display(object):
             landscape (bool): Orientation (default: False = portrait)
             rotate_180 (bool): Rotate text by 180 degrees
             spacing (int): Pixels between letters (default: 1)
+            chunk_size (int): Maximum bytes composed per block
+                (default: 4096)
+            scale (int): Integer magnification, not with rotate_180
+                (default: 1)
+        Note:
+            Letters, spacing and background are composed into a line
+            buffer (see render_text) and sent in one block, or one block
+            per group of letters that fits in chunk_size.
         """
-        iterable_text = reversed(text) if rotate_180 else text
-        for letter in iterable_text:
-            # Get letter array and letter dimensions
-            w, h = self.draw_letter(x, y, letter, font, color, background,
-                                    landscape, rotate_180)
-            # Stop on error
-            if w == 0 or h == 0:
-                print('Invalid width {0} or height {1}'.format(w, h))
-                return
-
+        h = font.height
+        max_width = max(chunk_size // (h * 2), 1)
+        # Split the text into runs of letters that fit in a chunk
+        runs = []
+        start = 0
+        width = 0
+        for i, letter in enumerate(text):
+            if not 0 <= ord(letter) - font.start_letter < font.letter_count:
+                if self.debug:
+                    print('Font does not contain character: ' + letter)
+                text = text[:i]
+                break
+            advance = font.measure_text(letter, spacing)
+            if width and width + advance > max_width:
+                runs.append((start, i, width))
+                start = i
+                width = 0
+            width += advance
+        if width:
+            runs.append((start, len(text), width))
+        if rotate_180:
+            runs.reverse()
+        rotate = 180 if rotate_180 else 0
+        for start, end, width in runs:
+            buf = self.pool.scratch(width * h * 2, 5)
+            self.render_text(text[start:end], font, color, background,
+                             landscape, spacing, buf, rotate_180)
             if landscape:
-                # Fill in spacing
-                if spacing:
-                    self.fill_hrect(x, y - w - spacing, h, spacing, background)
-                # Position y for next letter
-                y -= (w + spacing)
+                y -= width * scale
+                self.draw_sprite(buf, x, y, h, width, rotate, scale=scale)
             else:
-                # Fill in spacing
-                if spacing:
-                    self.fill_hrect(x + w, y, spacing, h, background)
-                # Position x for next letter
-                x += (w + spacing)
-
-                # # Fill in spacing
-                # if spacing:
-                #     self.fill_vrect(x + w, y, spacing, h, background)
-                # # Position x for next letter
-                # x += w + spacing
+                self.draw_sprite(buf, x, y, width, h, rotate, scale=scale)
+                x += width * scale
 
     def draw_text8x8(self, x, y, text, color,  background=0,
                      rotate=0):
@@ -658,50 +1357,27 @@ class Display(object):
             color (int): RGB565 color value.
             background (int): RGB565 background color (default: black).
             rotate(int): 0, 90, 180, 270
+        Note:
+            Each row of every letter is one slice copy from the expansion
+            table (see text8x8_table) into a line buffer, which is sent
+            with one block write.
         """
         w = len(text) * 8
-        h = 8
-        # Confirm coordinates in boundary
-        if self.is_off_grid(x, y, x + 7, y + 7):
+        if w == 0:
             return
-        # Rearrange color
-        r = (color & 0xF800) >> 8
-        g = (color & 0x07E0) >> 3
-        b = (color & 0x1F) << 3
-        buf = bytearray(w * 16)
-        fbuf = FrameBuffer(buf, w, h, RGB565)
-        if background != 0:
-            bg_r = (background & 0xF800) >> 8
-            bg_g = (background & 0x07E0) >> 3
-            bg_b = (background & 0x1F) << 3
-            fbuf.fill(color565(bg_b, bg_r, bg_g))
-        fbuf.text(text, 0, 0, color565(b, r, g))
-        if rotate == 0:
-            self.block(x, y, x + w - 1, y + (h - 1), buf)
-        elif rotate == 90:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, h, w, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(y1, x1,
-                                fbuf.pixel(x1, (h - 1) - y1))
-            self.block(x, y, x + (h - 1), y + w - 1, buf2)
-        elif rotate == 180:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, w, h, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(x1, y1,
-                                fbuf.pixel((w - 1) - x1, (h - 1) - y1))
-            self.block(x, y, x + w - 1, y + (h - 1), buf2)
-        elif rotate == 270:
-            buf2 = bytearray(w * 16)
-            fbuf2 = FrameBuffer(buf2, h, w, RGB565)
-            for y1 in range(h):
-                for x1 in range(w):
-                    fbuf2.pixel(y1, x1,
-                                fbuf.pixel((w - 1) - x1, y1))
-            self.block(x, y, x + (h - 1), y + w - 1, buf2)
+        table = self.text8x8_table(color, background)
+        atlas = self.text8x8_atlas
+        # framebuf draws letters outside ASCII 32-127 as 127
+        letters = [ord(c) - 32 if 32 <= ord(c) <= 127 else 95 for c in text]
+        buf = self.pool.scratch(w * 16, 5)
+        pos = 0
+        for row in range(0, 768, 96):
+            for letter in letters:
+                start = atlas[row + letter] << 4
+                buf[pos:pos + 16] = table[start:start + 16]
+                pos += 16
+        # Rotation is done by the panel (see draw_sprite_transformed)
+        self.draw_sprite(buf[:w * 16], x, y, w, 8, rotate)
 
     def draw_vline(self, x, y, h, color):
         """Draw a vertical line.
@@ -712,11 +1388,14 @@ class Display(object):
             h (int): Height of line.
             color (int): RGB565 color value.
         """
-        # Confirm coordinates in boundary
-        if self.is_off_grid(x, y, x, y + h - 1):
+        if x < self.clip_x0 or x > self.clip_x1:
+            return
+        y2 = min(y + h - 1, self.clip_y1)
+        y = max(y, self.clip_y0)
+        if y > y2:
             return
-        line = color.to_bytes(2, 'big') * h
-        self.block(x, y, x, y + h - 1, line)
+        line = self.pool.fill(color, (y2 - y + 1) * 2)
+        self.block(x, y, x, y2, line)
 
     def fill_circle(self, x0, y0, r, color):
         """Draw a filled circle.
@@ -808,14 +1487,15 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        x, y, w, h = self.clip_rect(x, y, w, h)
+        if w <= 0 or h <= 0:
             return
         chunk_height = 1024 // w
         chunk_count, remainder = divmod(h, chunk_height)
         chunk_size = chunk_height * w
         chunk_y = y
         if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
+            buf = self.pool.fill(color, chunk_size * 2)
             for c in range(0, chunk_count):
                 self.block(x, chunk_y,
                            x + w - 1, chunk_y + chunk_height - 1,
@@ -823,7 +1503,7 @@ class Display(object):
                 chunk_y += chunk_height
 
         if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * w
+            buf = self.pool.fill(color, remainder * w * 2)
             self.block(x, chunk_y,
                        x + w - 1, chunk_y + remainder - 1,
                        buf)
@@ -838,8 +1518,6 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-            return
         if w > h:
             self.fill_hrect(x, y, w, h, color)
         else:
@@ -859,73 +1537,72 @@ class Display(object):
             Since pixels are not divisible, the radius is integer rounded
             up to complete on a full pixel.  Therefore diameter = 2 x r + 1.
         """
-        # Determine side coordinates
-        coords = []
-        theta = radians(rotate)
-        n = sides + 1
-        for s in range(n):
-            t = 2.0 * pi * s / sides + theta
-            coords.append([int(r * cos(t) + x0), int(r * sin(t) + y0)])
-        # Starting point
-        x1, y1 = coords[0]
-        # Minimum Maximum X dict
-        xdict = {y1: [x1, x1]}
-        # Iterate through coordinates
-        for row in coords[1:]:
-            x2, y2 = row
-            xprev, yprev = x2, y2
-            # Calculate perimeter
-            # Check for horizontal side
-            if y1 == y2:
-                if x1 > x2:
-                    x1, x2 = x2, x1
-                if y1 in xdict:
-                    xdict[y1] = [min(x1, xdict[y1][0]), max(x2, xdict[y1][1])]
-                else:
-                    xdict[y1] = [x1, x2]
-                x1, y1 = xprev, yprev
-                continue
-            # Non horizontal side
-            # Changes in x, y
-            dx = x2 - x1
-            dy = y2 - y1
-            # Determine how steep the line is
-            is_steep = abs(dy) > abs(dx)
-            # Rotate line
-            if is_steep:
-                x1, y1 = y1, x1
-                x2, y2 = y2, x2
-            # Swap start and end points if necessary
-            if x1 > x2:
-                x1, x2 = x2, x1
-                y1, y2 = y2, y1
-            # Recalculate differentials
-            dx = x2 - x1
-            dy = y2 - y1
-            # Calculate error
-            error = dx >> 1
-            ystep = 1 if y1 < y2 else -1
-            y = y1
-            # Calcualte minimum and maximum x values
-            for x in range(x1, x2 + 1):
-                if is_steep:
-                    if x in xdict:
-                        xdict[x] = [min(y, xdict[x][0]), max(y, xdict[x][1])]
-                    else:
-                        xdict[x] = [y, y]
-                else:
-                    if y in xdict:
-                        xdict[y] = [min(x, xdict[y][0]), max(x, xdict[y][1])]
-                    else:
-                        xdict[y] = [x, x]
-                error -= abs(dy)
-                if error < 0:
-                    y += ystep
-                    error += dx
-            x1, y1 = xprev, yprev
-        # Fill polygon
-        for y, x in xdict.items():
-            self.draw_hline(x[0], y, x[1] - x[0] + 2, color)
+        self.fill_polygon_coords(self.polygon_coords(sides, x0, y0, r,
+                                                     rotate), color)
+
+    def fill_polygon_coords(self, coords, color):
+        """Draw an arbitrary filled polygon (convex or concave).
+
+        Args:
+            coords ([[int, int],...]): Vertex X, Y pairs (closed implicitly).
+            color (int): RGB565 color value.
+        Note:
+            Scanline fill with an active edge table and the even-odd rule.
+            Edges cover rows top inclusive, bottom exclusive, so each row
+            inside the polygon is filled once.  Identical spans on
+            consecutive rows are merged into a single multi-row block.  The
+            outline is drawn with draw_lines as well, which adds the bottom
+            row and covers every pixel draw_polygon draws.
+        """
+        # Edge table: [y top, y bottom, x at top (16.16 fixed), x step]
+        edges = []
+        n = len(coords)
+        for i in range(n):
+            xa, ya = coords[i]
+            xb, yb = coords[(i + 1) % n]
+            if ya == yb:
+                continue  # Horizontal edges are drawn with the outline
+            if ya > yb:
+                xa, ya, xb, yb = xb, yb, xa, ya
+            edges.append([ya, yb, (xa << 16) + 0x8000,
+                          ((xb - xa) << 16) // (yb - ya)])
+        outline = list(coords)
+        outline.append(coords[0])
+        self.draw_lines(outline, color)
+        if not edges:
+            return
+        edges.sort(key=lambda e: e[0])
+        y = max(edges[0][0], self.clip_y0)
+        y_end = min(max(e[1] for e in edges), self.clip_y1 + 1)
+        # Skip edges above the clip rectangle
+        for e in edges:
+            if e[0] < y:
+                e[2] += e[3] * (min(y, e[1]) - e[0])
+                e[0] = y
+        active = []
+        next_edge = 0
+        pending = {}  # (x left, x right) -> first row of the span
+        while y < y_end:
+            # Add edges starting on this row and drop finished ones
+            while next_edge < len(edges) and edges[next_edge][0] <= y:
+                if edges[next_edge][1] > y:
+                    active.append(edges[next_edge])
+                next_edge += 1
+            active = [e for e in active if e[1] > y]
+            xs = sorted(e[2] >> 16 for e in active)
+            spans = {}
+            for i in range(0, len(xs) - 1, 2):
+                spans[(xs[i], xs[i + 1])] = pending.pop((xs[i], xs[i + 1]),
+                                                        y)
+            # Flush spans that did not continue on this row
+            for (xl, xr), top in pending.items():
+                self.fill_hrect(xl, top, xr - xl + 1, y - top, color)
+            pending = spans
+            for e in active:
+                e[2] += e[3]
+            y += 1
+        for (xl, xr), top in pending.items():
+            self.fill_hrect(xl, top, xr - xl + 1, y - top, color)
 
     def fill_vrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for vertical drawing).
@@ -937,14 +1614,15 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        x, y, w, h = self.clip_rect(x, y, w, h)
+        if w <= 0 or h <= 0:
             return
         chunk_width = 1024 // h
         chunk_count, remainder = divmod(w, chunk_width)
         chunk_size = chunk_width * h
         chunk_x = x
         if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
+            buf = self.pool.fill(color, chunk_size * 2)
             for c in range(0, chunk_count):
                 self.block(chunk_x, y,
                            chunk_x + chunk_width - 1, y + h - 1,
@@ -952,7 +1630,7 @@ class Display(object):
                 chunk_x += chunk_width
 
         if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * h
+            buf = self.pool.fill(color, remainder * h * 2)
             self.block(chunk_x, y,
                        chunk_x + remainder - 1, y + h - 1,
                        buf)
@@ -968,6 +1646,16 @@ class Display(object):
         else:
             self.write_cmd(self.INVOFF)
 
+    def invalidate_window(self):
+        """Forget the cached column/page window.
+
+        Notes:
+            Call after anything that changes the panel address state
+            outside of block() (reset, MADCTL writes, raw commands).
+        """
+        self.window_column = None
+        self.window_page = None
+
     def is_off_grid(self, xmin, ymin, xmax, ymax):
         """Check if coordinates extend past display boundaries.
 
@@ -978,20 +1666,27 @@ class Display(object):
             ymax (int): Maximum vertical pixel.
         Returns:
             boolean: False = Coordinates OK, True = Error.
+        Note:
+            Drawing primitives clip silently instead of calling this.
+            Messages are only printed when debug is enabled.
         """
         if xmin < 0:
-            print('x-coordinate: {0} below minimum of 0.'.format(xmin))
+            if self.debug:
+                print('x-coordinate: {0} below minimum of 0.'.format(xmin))
             return True
         if ymin < 0:
-            print('y-coordinate: {0} below minimum of 0.'.format(ymin))
+            if self.debug:
+                print('y-coordinate: {0} below minimum of 0.'.format(ymin))
             return True
         if xmax >= self.width:
-            print('x-coordinate: {0} above maximum of {1}.'.format(
-                xmax, self.width - 1))
+            if self.debug:
+                print('x-coordinate: {0} above maximum of {1}.'.format(
+                    xmax, self.width - 1))
             return True
         if ymax >= self.height:
-            print('y-coordinate: {0} above maximum of {1}.'.format(
-                ymax, self.height - 1))
+            if self.debug:
+                print('y-coordinate: {0} above maximum of {1}.'.format(
+                    ymax, self.height - 1))
             return True
         return False
 
@@ -1009,11 +1704,197 @@ class Display(object):
         with open(path, "rb") as f:
             return f.read(buf_size)
 
+    def polygon_coords(self, sides, x0, y0, r, rotate=0):
+        """Return the vertices of an n-sided regular polygon.
+
+        Args:
+            sides (int): Number of polygon sides.
+            x0, y0 (int): Coordinates of center point.
+            r (int): Radius.
+            rotate (Optional float): Rotation in degrees relative to origin.
+        Returns:
+            [[int, int],...]: Vertex X, Y pairs.
+        """
+        return [[x0 + ((r * cos_fixed(rotate + 360 * s / sides) + 8192) >> 14),
+                 y0 + ((r * sin_fixed(rotate + 360 * s / sides) + 8192) >> 14)]
+                for s in range(sides)]
+
+    def pop_clip(self):
+        """Restore the clip rectangle saved by the matching push_clip()."""
+        (self.clip_x0, self.clip_y0,
+         self.clip_x1, self.clip_y1) = self.clip_stack.pop()
+
+    def push_clip(self, x, y, w, h):
+        """Save the clip rectangle and restrict drawing to a region.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of region.
+            h (int): Height of region.
+        Note:
+            The new clip rectangle is the intersection of the region and
+            the current clip rectangle.
+        """
+        self.clip_stack.append((self.clip_x0, self.clip_y0,
+                                self.clip_x1, self.clip_y1))
+        self.clip_x0 = max(self.clip_x0, x)
+        self.clip_y0 = max(self.clip_y0, y)
+        self.clip_x1 = min(self.clip_x1, x + w - 1)
+        self.clip_y1 = min(self.clip_y1, y + h - 1)
+
+    def read_image_rows(self, f, w, h, chunk_size=4096):
+        """Read rows of a raw image in chunks using two alternating buffers.
+
+        Args:
+            f (file): Raw RGB565 image file positioned at the first row.
+            w (int): Width of image.
+            h (int): Number of rows to read.
+            chunk_size (int): Bytes per chunk (rounded down to whole rows).
+        Yields:
+            (memoryview, int): Chunk data and number of rows in it.
+        Note:
+            Chunks are read with readinto() into scratch slots 2 and 3 of
+            the buffer pool, so streaming does not allocate.  Alternating
+            the buffers leaves the previous chunk intact while the next one
+            is read.
+        """
+        row_bytes = w * 2
+        chunk_rows = min(max(chunk_size // row_bytes, 1), h)
+        size = chunk_rows * row_bytes
+        bufs = (self.pool.scratch(size, 2), self.pool.scratch(size, 3))
+        i = 0
+        while h > 0:
+            rows = min(chunk_rows, h)
+            buf = bufs[i][:rows * row_bytes]
+            f.readinto(buf)
+            yield buf, rows
+            h -= rows
+            i ^= 1
+
+    def read_image_region(self, f, x, y, w, h, src_width, chunk_size=4096):
+        """Read a rectangle of a raw image in chunks of whole rows.
+
+        Args:
+            f (file): Raw RGB565 image file.
+            x (int): X coordinate of the rectangle in the image.
+            y (int): Y coordinate of the rectangle in the image.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            src_width (int): Width of the whole image.
+            chunk_size (int): Bytes per chunk (rounded down to whole rows).
+        Yields:
+            (memoryview, int): Chunk data and number of rows in it.
+        Note:
+            Each row is one seek and one readinto() into scratch slots 2
+            and 3 (see read_image_rows), full width rectangles are read
+            without seeking.
+        """
+        f.seek((y * src_width + x) * 2)
+        if w == src_width:
+            yield from self.read_image_rows(f, w, h, chunk_size)
+            return
+        row_bytes = w * 2
+        stride = src_width * 2
+        chunk_rows = min(max(chunk_size // row_bytes, 1), h)
+        size = chunk_rows * row_bytes
+        bufs = (self.pool.scratch(size, 2), self.pool.scratch(size, 3))
+        offset = (y * src_width + x) * 2
+        i = 0
+        while h > 0:
+            rows = min(chunk_rows, h)
+            buf = bufs[i]
+            for pos in range(0, rows * row_bytes, row_bytes):
+                f.seek(offset)
+                f.readinto(buf[pos:pos + row_bytes])
+                offset += stride
+            yield buf[:rows * row_bytes], rows
+            h -= rows
+            i ^= 1
+
+    def read_rle_rows(self, f, chunk_size=4096):
+        """Read an RLE image header and return a row chunk iterator.
+
+        Args:
+            f (file): RL16 image file positioned at the start.
+            chunk_size (int): Bytes per chunk (rounded down to whole rows).
+        Returns:
+            (int, int, iterator): Width, height and an iterator of
+                (memoryview, rows) chunks.
+        Note:
+            Decoding uses scratch slots 2 and 3 for output and slot 4 for
+            input, so RAM use is bounded by chunk_size plus 512 bytes.
+        """
+        w, h, fmt = read_header(f)
+        if fmt != FORMAT_RLE:
+            return w, h, self.read_image_rows(f, w, h, chunk_size)
+        row_bytes = w * 2
+        size = min(max(chunk_size // row_bytes, 1), h) * row_bytes
+        pool = self.pool
+        bufs = (pool.scratch(size, 2), pool.scratch(size, 3))
+        return w, h, decode_rows(f, w, h, bufs, pool.scratch(512, 4))
+
+    def render_text(self, text, font, color, background=0, landscape=False,
+                    spacing=1, buf=None, spacing_before=False):
+        """Compose a run of text into one pixel buffer.
+
+        Args:
+            text (string): Text to render.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait).
+            spacing (int): Pixels between letters (default: 1).
+            buf (bytearray): Destination of at least w * h * 2 bytes
+                (default: None = allocate).
+            spacing_before (bool): Put the spacing before each letter
+                instead of after it, so the run drawn rotated 180 degrees
+                lines up with letters drawn one at a time (default: False).
+        Returns:
+            (bytearray): Pixel data.
+            (int, int): Text width (including spacing after each letter)
+                and height.
+        Note:
+            Like get_letter, landscape data is h pixels wide and w high
+            with the first letter at the bottom.  Rendering stops at the
+            first letter missing from the font.
+        """
+        h = font.height
+        advances = []
+        for letter in text:
+            if not 0 <= ord(letter) - font.start_letter < font.letter_count:
+                break
+            advances.append(font.measure_text(letter, spacing))
+        total = sum(advances)
+        size = total * h * 2
+        if buf is None:
+            buf = bytearray(size)
+        out = memoryview(buf)[:size]
+        out[:] = self.pool.fill(background, size)
+        pos = spacing if spacing_before else 0
+        for letter, advance in zip(text, advances):
+            glyph, w, _ = font.get_letter(letter, color, background,
+                                          landscape, self.pool)
+            if landscape:
+                # Whole rows of a landscape letter are contiguous
+                start = (total - pos - w) * h * 2
+                out[start:start + w * h * 2] = glyph
+            else:
+                row_bytes = w * 2
+                stride = total * 2
+                dst = pos * 2
+                for src in range(0, h * row_bytes, row_bytes):
+                    out[dst:dst + row_bytes] = glyph[src:src + row_bytes]
+                    dst += stride
+            pos += advance
+        return buf, total, h
+
     def reset_cpy(self):
         """Perform reset: Low=initialization, High=normal operation.
 
         Notes: CircuitPython implemntation
         """
+        self.invalidate_window()
         self.rst.value = False
         sleep(.05)
         self.rst.value = True
@@ -1024,6 +1905,7 @@ class Display(object):
 
         Notes: MicroPython implemntation
         """
+        self.invalidate_window()
         self.rst(0)
         sleep(.05)
         self.rst(1)
@@ -1043,10 +1925,16 @@ class Display(object):
         Args:
             top (int): Height of top scroll margin
             bottom (int): Height of bottom scroll margin
+        Note:
+            Margins are along the panel's native rows, which run along x
+            in the 90 and 270 degree rotations.
         """
-        if top + bottom <= self.height:
-            middle = self.height - (top + bottom)
-            print(top, middle, bottom)
+        # MADCTL MV set: native rows are the display's columns
+        length = self.width if self.rotation & 0x20 else self.height
+        if top + bottom <= length:
+            middle = length - (top + bottom)
+            if self.debug:
+                print(top, middle, bottom)
             self.write_cmd(self.VSCRDEF,
                            top >> 8,
                            top & 0xFF,
@@ -1066,6 +1954,65 @@ class Display(object):
         else:
             self.write_cmd(self.SLPOUT)
 
+    def sprite_transform(self, x, y, w, h, rotate=0, mirror_x=False,
+                         mirror_y=False):
+        """Return the sprite to screen transform of a transformed blit.
+
+        Args:
+            x (int): X position of the transformed sprite's left edge.
+            y (int): Y position of the transformed sprite's top edge.
+            w (int): Width of the sprite data.
+            h (int): Height of the sprite data.
+            rotate (Optional int): Clockwise rotation 0, 90, 180 or 270
+                (applied after mirroring).
+            mirror_x (Optional bool): Flip the sprite left to right.
+            mirror_y (Optional bool): Flip the sprite top to bottom.
+        Returns:
+            (int, int, int, int, int, int): ta, tb, tc, td, tx, ty mapping
+                sprite pixel (i, j) to screen (ta*i + tb*j + tx,
+                tc*i + td*j + ty).  The inverse is the transpose.
+        """
+        if rotate not in (0, 90, 180, 270):
+            raise ValueError('Rotate must be 0, 90, 180 or 270.')
+        ta = -1 if mirror_x else 1
+        tb = tc = 0
+        td = -1 if mirror_y else 1
+        for _ in range(rotate // 90):
+            # Quarter turn clockwise: (u, v) -> (-v, u)
+            ta, tb, tc, td = -tc, -td, ta, tb
+        # Offset placing the transformed sprite's top left at x, y
+        tx = x - min(0, ta * (w - 1)) - min(0, tb * (h - 1))
+        ty = y - min(0, tc * (w - 1)) - min(0, td * (h - 1))
+        return ta, tb, tc, td, tx, ty
+
+    def text8x8_table(self, color, background):
+        """Return the table expanding a row of an 8x8 letter to pixels.
+
+        Args:
+            color (int): RGB565 color of set bits.
+            background (int): RGB565 color of clear bits.
+        Returns:
+            memoryview: 256 entries of 16 bytes (see bit_table).
+        Note:
+            The first call also renders the built-in font into
+            text8x8_atlas: 8 rows of 96 bytes, one byte per letter
+            (ASCII 32-127) with bit 0 the leftmost pixel.
+        """
+        if self.text8x8_atlas is None:
+            atlas = bytearray(768)
+            fbuf = FrameBuffer(atlas, 768, 8, MONO_HMSB)
+            fbuf.text(''.join(chr(c) for c in range(32, 128)), 0, 0, 1)
+            self.text8x8_atlas = atlas
+        key = (color, background)
+        table = self.text8x8_tables.get(key)
+        if table is None:
+            if len(self.text8x8_order) >= self.TEXT8X8_TABLES:
+                del self.text8x8_tables[self.text8x8_order.pop(0)]
+            table = bit_table(color, background)
+            self.text8x8_tables[key] = table
+            self.text8x8_order.append(key)
+        return table
+
     def write_cmd_mpy(self, command, *args):
         """Write command to OLED (MicroPython).
 
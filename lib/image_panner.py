@@ -0,0 +1,130 @@
+"""Panning across raw images larger than the screen."""
+from lib.scroll_viewport import ScrollViewport
+
+
+class ImagePanner(object):
+    """Show a window of a large raw RGB565 image and move it around.
+
+    The image is laid out in world coordinates of a ScrollViewport, so
+    panning along the scroll axis is a hardware scroll followed by drawing
+    the newly revealed strip (see ScrollViewport.scroll_by).  Panning
+    across the scroll axis redraws the whole screen.  Only the rows and
+    columns that are drawn are read from flash, so RAM use does not depend
+    on the image size.  Images smaller than the screen are drawn at the
+    top left with the rest of the screen cleared.
+
+    Attributes:
+        display: Display object
+        viewport: ScrollViewport used for panning
+        path: Image file path
+        width: Width of the image
+        height: Height of the image
+        x, y: Image position shown at the top left of the screen
+        background: Color of the screen outside the image
+        drawn: False until the first view is drawn
+    """
+
+    def __init__(self, display, path, width, height, x=0, y=0,
+                 background=0):
+        """Initialize panner and draw the starting view.
+
+        Args:
+            display (Display): Display to draw to.
+            path (string): Raw image file path.
+            width (int): Width of image.
+            height (int): Height of image.
+            x, y (Optional int): Image position shown at the top left of
+                the screen (default 0, 0).
+            background (Optional int): RGB565 color of the screen outside
+                the image (default: black).
+        """
+        self.display = display
+        self.path = path
+        self.width = width
+        self.height = height
+        self.background = background
+        self.viewport = ScrollViewport(display)
+        self.x = 0
+        self.y = 0
+        self.drawn = False
+        self.pan_to(x, y)
+
+    def draw_strip(self, start, count):
+        """Draw image columns (or rows) along the scroll axis.
+
+        Args:
+            start (int): First image column (row in portrait).
+            count (int): Number of columns (rows).
+        Note:
+            Parts of the strip beyond the image are filled with the
+            background color.
+        """
+        display = self.display
+        viewport = self.viewport
+        background = self.background
+        if viewport.axis_x:
+            w = max(min(count, self.width - start), 0)
+            h = min(display.height, self.height)
+            if w:
+                viewport.draw_image_region(self.path, start, self.y, w, h,
+                                           start, 0, self.width)
+            if w < count:
+                viewport.fill_rectangle(start + w, 0, count - w, h,
+                                        background)
+            if h < display.height:
+                viewport.fill_rectangle(start, h, count, display.height - h,
+                                        background)
+        else:
+            w = min(display.width, self.width)
+            h = max(min(count, self.height - start), 0)
+            if h:
+                viewport.draw_image_region(self.path, self.x, start, w, h,
+                                           0, start, self.width)
+            if h < count:
+                viewport.fill_rectangle(0, start + h, w, count - h,
+                                        background)
+            if w < display.width:
+                viewport.fill_rectangle(w, start, display.width - w, count,
+                                        background)
+
+    def pan_by(self, dx, dy):
+        """Move the view.
+
+        Args:
+            dx, dy (int): Pixels to move the view over the image (clamped
+                to the image edges).
+        """
+        self.pan_to(self.x + dx, self.y + dy)
+
+    def pan_to(self, x, y):
+        """Show an image position at the top left of the screen.
+
+        Args:
+            x, y (int): Image position (clamped to the image edges).
+        """
+        display = self.display
+        viewport = self.viewport
+        x = min(max(x, 0), max(self.width - display.width, 0))
+        y = min(max(y, 0), max(self.height - display.height, 0))
+        if viewport.axis_x:
+            along = x
+            moved = y != self.y
+        else:
+            along = y
+            moved = x != self.x
+        self.x = x
+        self.y = y
+        size = viewport.area_size
+        delta = along - viewport.pos
+        if moved or abs(delta) >= size or not self.drawn:
+            # Nothing on the panel can be reused
+            viewport.scroll_to(along)
+            self.draw_strip(along, size)
+            self.drawn = True
+        elif delta:
+            start, count = viewport.scroll_by(delta)
+            self.draw_strip(start, count)
+
+    def reset(self):
+        """Restore the unscrolled full screen layout."""
+        self.viewport.reset()
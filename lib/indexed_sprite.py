@@ -0,0 +1,158 @@
+"""Palette indexed sprites."""
+
+
+class IndexedSprite(object):
+    """Sprite stored as 1, 2, 4 or 8 bit palette indices.
+
+    Attributes:
+        width: Width of sprite in pixels
+        height: Height of sprite in pixels
+        bpp: Bits per pixel (1, 2, 4 or 8)
+        indices: Packed indices, each row starts on a byte boundary
+            (most significant bits are the leftmost pixel)
+        palette: List of RGB565 colors
+        lut: Expansion table, maps a packed byte to its RGB565 pixels
+
+    Note:
+        Indices take 2-16x less RAM than RGB565 pixels.  At blit time each
+        packed byte is expanded with one slice copy from the lookup table,
+        so changing the palette recolors the sprite without reloading it.
+    """
+
+    def __init__(self, width, height, bpp, indices, palette):
+        """Constructor for indexed sprite.
+
+        Args:
+            width (int): Width of sprite.
+            height (int): Height of sprite.
+            bpp (int): Bits per pixel (1, 2, 4 or 8).
+            indices (bytearray): Packed row aligned indices.
+            palette ([int]): RGB565 colors (up to 2 ** bpp).
+        """
+        if bpp not in (1, 2, 4, 8):
+            raise ValueError('bpp must be 1, 2, 4 or 8.')
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.pixels_per_byte = 8 // bpp
+        self.row_bytes = (width * bpp + 7) // 8
+        self.indices = indices
+        self.lut = bytearray(256 * self.pixels_per_byte * 2)
+        self.set_palette(palette)
+
+    def expand_rows(self, buf, row, count):
+        """Expand rows of indices into RGB565 pixels.
+
+        Args:
+            buf (memoryview): Destination, count * width * 2 bytes plus
+                room for one packed byte of padding.
+            row (int): First row to expand.
+            count (int): Number of rows.
+        """
+        lut = memoryview(self.lut)
+        indices = self.indices
+        step = self.pixels_per_byte * 2
+        row_bytes = self.row_bytes
+        stride = self.width * 2
+        src = row * row_bytes
+        dst = 0
+        for _ in range(count):
+            pos = dst
+            for i in range(src, src + row_bytes):
+                start = indices[i] * step
+                buf[pos:pos + step] = lut[start:start + step]
+                pos += step
+            # Padding of the last byte spills into the next row's start,
+            # which is overwritten when that row is expanded
+            src += row_bytes
+            dst += stride
+
+    def set_color(self, index, color):
+        """Change one palette entry.
+
+        Args:
+            index (int): Palette index.
+            color (int): RGB565 color value.
+        """
+        palette = list(self.palette)
+        palette[index] = color
+        self.set_palette(palette)
+
+    def set_palette(self, palette):
+        """Replace the palette and rebuild the expansion table.
+
+        Args:
+            palette ([int]): RGB565 colors (up to 2 ** bpp).
+        """
+        bpp = self.bpp
+        if len(palette) > 1 << bpp:
+            raise ValueError('Palette too large for {0} bpp.'.format(bpp))
+        self.palette = list(palette)
+        colors = [c.to_bytes(2, 'big') for c in self.palette]
+        # Unused indices fall back to the first color
+        colors += [colors[0]] * ((1 << bpp) - len(colors))
+        lut = self.lut
+        mask = (1 << bpp) - 1
+        shifts = range(8 - bpp, -1, -bpp)
+        pos = 0
+        for b in range(256):
+            for shift in shifts:
+                lut[pos:pos + 2] = colors[(b >> shift) & mask]
+                pos += 2
+
+
+def index_pixels(data, w, h, bpp=None):
+    """Convert RGB565 pixels to a palette indexed sprite.
+
+    Args:
+        data (bytes): Big endian RGB565 pixels (w * h * 2 bytes).
+        w (int): Width of sprite.
+        h (int): Height of sprite.
+        bpp (Optional int): Bits per pixel (default: smallest that fits).
+    Returns:
+        IndexedSprite: Sprite with colors in order of first appearance.
+    """
+    palette = []
+    lookup = {}
+    for i in range(0, w * h * 2, 2):
+        c = data[i] << 8 | data[i + 1]
+        if c not in lookup:
+            lookup[c] = len(palette)
+            palette.append(c)
+    if bpp is None:
+        for bpp in (1, 2, 4, 8):
+            if len(palette) <= 1 << bpp:
+                break
+    if len(palette) > 1 << bpp:
+        raise ValueError('{0} colors do not fit in {1} bpp.'.format(
+            len(palette), bpp))
+    row_bytes = (w * bpp + 7) // 8
+    indices = bytearray(row_bytes * h)
+    i = 0
+    for y in range(h):
+        pos = y * row_bytes
+        shift = 8 - bpp
+        for _ in range(w):
+            indices[pos] |= lookup[data[i] << 8 | data[i + 1]] << shift
+            i += 2
+            if shift == 0:
+                shift = 8 - bpp
+                pos += 1
+            else:
+                shift -= bpp
+    return IndexedSprite(w, h, bpp, indices, palette)
+
+
+def load_indexed_sprite(path, w, h, bpp=None):
+    """Load a raw RGB565 sprite file as a palette indexed sprite.
+
+    Args:
+        path (string): Image file path.
+        w (int): Width of image.
+        h (int): Height of image.
+        bpp (Optional int): Bits per pixel (default: smallest that fits).
+    Returns:
+        IndexedSprite: Loaded sprite.
+    """
+    with open(path, "rb") as f:
+        return index_pixels(f.read(w * h * 2), w, h, bpp)
@@ -0,0 +1,167 @@
+"""Run-length encoded RGB565 image format.
+
+File layout (little endian header, 10 bytes):
+    magic (4 bytes): b'RL16'
+    width (uint16): Image width in pixels
+    height (uint16): Image height in pixels
+    format (uint8): FORMAT_RAW or FORMAT_RLE
+    reserved (uint8): 0
+
+FORMAT_RAW is followed by plain big endian RGB565 pixels.  FORMAT_RLE is
+followed by packets over big endian RGB565 pixels (PackBits on 16-bit
+units):
+    0x80 | (n - 1), pixel: run of n (1-128) copies of one pixel
+    n - 1, pixels: n (1-128) literal pixels
+
+Pixels run left to right, top to bottom and packets may span rows.
+
+Encode on the host with:
+    python3 lib/rle_image.py input.raw output.rle width height
+"""
+from struct import pack, unpack
+
+MAGIC = b'RL16'
+HEADER_SIZE = 10
+FORMAT_RAW = 0
+FORMAT_RLE = 1
+
+
+def read_header(f):
+    """Read an RLE image header.
+
+    Args:
+        f (file): Image file positioned at the start.
+    Returns:
+        (int, int, int): Width, height and format.
+    """
+    magic, w, h, fmt, _ = unpack('<4sHHBB', f.read(HEADER_SIZE))
+    if magic != MAGIC:
+        raise ValueError('Not an RL16 image.')
+    return w, h, fmt
+
+
+def decode_rows(f, w, h, bufs, inbuf):
+    """Decode RLE pixel data in chunks of whole rows.
+
+    Args:
+        f (file): Image file positioned after the header.
+        w (int): Width of image.
+        h (int): Height of image.
+        bufs ((memoryview, memoryview)): Two output buffers of whole rows,
+            used alternately.
+        inbuf (memoryview): Input buffer (at least 257 bytes).
+    Yields:
+        (memoryview, int): Decoded chunk and number of rows in it.
+    """
+    row_bytes = w * 2
+    chunk_rows = len(bufs[0]) // row_bytes
+    remaining = h
+    which = 0
+    size = min(chunk_rows, remaining) * row_bytes
+    out = bufs[0][:size]
+    opos = 0
+    ipos = 0
+    ilen = 0
+    while True:
+        # Keep a whole literal packet (1 + 128 * 2 bytes) available
+        if ilen - ipos < 257:
+            rest = ilen - ipos
+            inbuf[:rest] = inbuf[ipos:ilen]
+            ilen = rest + (f.readinto(inbuf[rest:]) or 0)
+            ipos = 0
+            if ilen == 0:
+                return
+        c = inbuf[ipos]
+        run = c & 0x80
+        n = ((c & 0x7F) + 1) * 2
+        if run:
+            hi = inbuf[ipos + 1]
+            lo = inbuf[ipos + 2]
+            ipos += 3
+        else:
+            ipos += 1
+        while n:
+            k = min(n, size - opos)
+            if run:
+                # Write one pixel then double it up to k bytes
+                out[opos] = hi
+                out[opos + 1] = lo
+                filled = 2
+                while filled < k:
+                    m = min(filled, k - filled)
+                    out[opos + filled:opos + filled + m] = out[opos:opos + m]
+                    filled += m
+            else:
+                out[opos:opos + k] = inbuf[ipos:ipos + k]
+                ipos += k
+            opos += k
+            n -= k
+            if opos == size:
+                rows = size // row_bytes
+                yield out, rows
+                remaining -= rows
+                if remaining <= 0:
+                    return
+                which ^= 1
+                size = min(chunk_rows, remaining) * row_bytes
+                out = bufs[which][:size]
+                opos = 0
+
+
+def encode(data, w, h):
+    """Encode raw RGB565 pixel data as an RLE image.
+
+    Args:
+        data (bytes): Big endian RGB565 pixels (w * h * 2 bytes).
+        w (int): Width of image.
+        h (int): Height of image.
+    Returns:
+        bytes: Image file contents (raw format if RLE would be larger).
+    """
+    size = w * h * 2
+    if len(data) != size:
+        raise ValueError('Expected {0} bytes, got {1}.'.format(size,
+                                                             len(data)))
+    out = bytearray()
+    literal = bytearray()
+
+    def flush_literal():
+        if literal:
+            out.append(len(literal) // 2 - 1)
+            out.extend(literal)
+            literal[:] = b''
+
+    i = 0
+    while i < size:
+        pixel = data[i:i + 2]
+        j = i + 2
+        while j < size and j - i < 256 and data[j:j + 2] == pixel:
+            j += 2
+        count = (j - i) // 2
+        if count > 1:
+            flush_literal()
+            out.append(0x80 | (count - 1))
+            out.extend(pixel)
+        else:
+            literal.extend(pixel)
+            if len(literal) == 256:
+                flush_literal()
+        i = j
+    flush_literal()
+    if len(out) >= size:
+        return pack('<4sHHBB', MAGIC, w, h, FORMAT_RAW, 0) + bytes(data)
+    return pack('<4sHHBB', MAGIC, w, h, FORMAT_RLE, 0) + bytes(out)
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 5:
+        print('Usage: rle_image.py input.raw output.rle width height')
+        sys.exit(1)
+    with open(sys.argv[1], 'rb') as f:
+        raw = f.read()
+    encoded = encode(raw, int(sys.argv[3]), int(sys.argv[4]))
+    with open(sys.argv[2], 'wb') as f:
+        f.write(encoded)
+    print('{0}: {1} -> {2} bytes'.format(sys.argv[2], len(raw),
+                                         len(encoded)))
@@ -0,0 +1,193 @@
+"""World coordinate viewport on top of the ILI9341 hardware scroll."""
+
+
+class ScrollViewport(object):
+    """Draw in world coordinates while the panel scrolls in hardware.
+
+    The scroll area of panel RAM is used as a ring buffer: world coordinate
+    u along the scroll axis is stored at RAM position
+    area_start + (u mod area_size).  Scrolling only changes the hardware
+    scroll start (one command per frame), after which only the newly
+    exposed world columns (or rows) need drawing.
+
+    Attributes:
+        display: Display object
+        axis_x: True if the panel scrolls along x (landscape rotations)
+        area_start: First scrolling RAM position (after the start margin)
+        area_size: Number of scrolling pixels along the axis
+        pos: World coordinate shown at the start of the scroll area
+
+    Note:
+        The hardware scrolls along the panel's native rows.  With the 90 and
+        270 degree rotations that is the display's x axis.  Coordinates
+        across the scroll axis are plain screen coordinates.
+    """
+
+    def __init__(self, display, margin_start=0, margin_end=0):
+        """Initialize viewport.
+
+        Args:
+            display (Display): Display to scroll.
+            margin_start (Optional int): Fixed pixels at the start of the
+                scroll axis (left or top) (default 0).
+            margin_end (Optional int): Fixed pixels at the end of the scroll
+                axis (right or bottom) (default 0).
+        """
+        self.display = display
+        # MADCTL MV swaps rows/columns, MY mirrors the native row order
+        self.axis_x = bool(display.rotation & 0x20)
+        self.mirrored = bool(display.rotation & 0x80)
+        length = display.width if self.axis_x else display.height
+        self.area_start = margin_start
+        self.area_size = length - margin_start - margin_end
+        if self.mirrored:
+            self.fixed_top, self.fixed_bottom = margin_end, margin_start
+        else:
+            self.fixed_top, self.fixed_bottom = margin_start, margin_end
+        self.pos = 0
+        display.set_scroll(self.fixed_top, self.fixed_bottom)
+        self.scroll_to(0)
+
+    def draw(self, func, x, y, extent, *args):
+        """Call a Display primitive at world coordinates.
+
+        Args:
+            func (function): Primitive taking (x, y, *args), e.g.
+                display.draw_sprite with args (w, h) after the buffer.
+            x, y (int): World position passed to func.
+            extent (int): Size of the drawing along the scroll axis.
+            *args: Remaining arguments for func.
+        Note:
+            Drawings that cross the end of the scroll area are drawn twice
+            and clipped, once on each side of the seam.
+        """
+        display = self.display
+        start = self.area_start
+        size = self.area_size
+        u = x if self.axis_x else y
+        r = start + u % size
+        if self.axis_x:
+            display.push_clip(start, 0, size, display.height)
+        else:
+            display.push_clip(0, start, display.width, size)
+        for ram in ((r, r - size) if r + extent > start + size else (r,)):
+            if self.axis_x:
+                func(ram, y, *args)
+            else:
+                func(x, ram, *args)
+        display.pop_clip()
+
+    def draw_image(self, path, x, y, w, h):
+        """Draw an image from flash at world coordinates.
+
+        Args:
+            path (string): Image file path.
+            x, y (int): World position of image top left.
+            w (int): Width of image.
+            h (int): Height of image.
+        """
+        display = self.display
+        self.draw(lambda dx, dy: display.draw_image(path, dx, dy, w, h),
+                  x, y, w if self.axis_x else h)
+
+    def draw_image_region(self, path, src_x, src_y, w, h, x, y, src_width):
+        """Draw part of an image from flash at world coordinates.
+
+        Args:
+            path (string): Image file path.
+            src_x, src_y (int): Top left of the region in the image.
+            w (int): Width of region.
+            h (int): Height of region.
+            x, y (int): World position of region top left.
+            src_width (int): Width of the whole image.
+        """
+        display = self.display
+        self.draw(lambda dx, dy: display.draw_image_region(
+            path, src_x, src_y, w, h, dx, dy, src_width),
+                  x, y, w if self.axis_x else h)
+
+    def draw_sprite(self, buf, x, y, w, h, runs=None):
+        """Draw a sprite at world coordinates.
+
+        Args:
+            buf (bytearray): Sprite pixel data.
+            x, y (int): World position of sprite top left.
+            w (int): Width of sprite.
+            h (int): Height of sprite.
+            runs (Optional [[(int, int)]]): Opaque runs of every row for a
+                transparent sprite (see opaque_runs).
+        """
+        display = self.display
+        if runs is None:
+            func = lambda dx, dy: display.draw_sprite(buf, dx, dy, w, h)
+        else:
+            func = lambda dx, dy: display.draw_sprite_runs(buf, dx, dy, w, h,
+                                                           runs)
+        self.draw(func, x, y, w if self.axis_x else h)
+
+    def draw_text(self, x, y, text, font, color, background=0, spacing=1):
+        """Draw text at world coordinates.
+
+        Args:
+            x, y (int): World position of text top left.
+            text (string): Text to draw.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            spacing (int): Pixels between letters (default: 1).
+        """
+        display = self.display
+        extent = (font.measure_text(text, spacing) if self.axis_x
+                  else font.height)
+        self.draw(lambda dx, dy: display.draw_text(dx, dy, text, font, color,
+                                                   background,
+                                                   spacing=spacing),
+                  x, y, extent)
+
+    def fill_rectangle(self, x, y, w, h, color):
+        """Draw a filled rectangle at world coordinates.
+
+        Args:
+            x, y (int): World position of rectangle top left.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        """
+        self.draw(self.display.fill_rectangle, x, y,
+                  w if self.axis_x else h, w, h, color)
+
+    def reset(self):
+        """Restore the unscrolled full screen layout."""
+        display = self.display
+        display.set_scroll(0, 0)
+        display.scroll(0)
+        self.pos = 0
+
+    def scroll_by(self, delta):
+        """Scroll the view along the world.
+
+        Args:
+            delta (int): Pixels to move the view (positive moves towards
+                higher world coordinates).
+        Returns:
+            (int, int): First world coordinate and size of the newly exposed
+                strip (size 0 if nothing new is visible).
+        """
+        old = self.pos
+        self.scroll_to(old + delta)
+        size = self.area_size
+        if delta >= 0:
+            return max(old + size, self.pos), min(delta, size)
+        return self.pos, min(-delta, size)
+
+    def scroll_to(self, pos):
+        """Show world coordinate pos at the start of the scroll area.
+
+        Args:
+            pos (int): World coordinate.
+        """
+        self.pos = pos
+        offset = pos % self.area_size
+        if self.mirrored:
+            offset = (self.area_size - offset) % self.area_size
+        self.display.scroll(self.fixed_top + offset)
@@ -0,0 +1,240 @@
+"""Moving sprites over a restorable background."""
+from lib.ili9341 import opaque_runs
+from lib.indexed_sprite import IndexedSprite
+
+
+class Sprite(object):
+    """Sprite managed by a SpriteLayer.
+
+    Attributes:
+        image: RGB565 pixel data (bytes) or IndexedSprite
+        x, y: Position of top left corner
+        w, h: Size in pixels
+        key: RGB565 color treated as transparent (-1 = opaque)
+        runs: Opaque runs of every row (see opaque_runs)
+        visible: False to hide the sprite
+        drawn: Rectangle (x, y, w, h) on the panel, None if not drawn
+        dirty: True when the sprite must be redrawn in place
+
+    Note:
+        Transparent pixels are found once, when the sprite is created, so
+        recoloring an IndexedSprite keeps its shape.
+    """
+
+    def __init__(self, image, x, y, w=None, h=None, key=-1):
+        """Constructor for sprite.
+
+        Args:
+            image (bytes or IndexedSprite): Sprite pixels (as returned by
+                load_sprite) or a palette indexed sprite.
+            x, y (int): Initial position of top left corner.
+            w (Optional int): Width (taken from an IndexedSprite).
+            h (Optional int): Height (taken from an IndexedSprite).
+            key (Optional int): RGB565 color to treat as transparent
+                (default -1 = opaque).
+        """
+        self.image = image
+        if isinstance(image, IndexedSprite):
+            w = image.width
+            h = image.height
+            # Row buffer with room for the padding of the last packed byte
+            self.row_buf = memoryview(bytearray(w * 2 +
+                                                image.pixels_per_byte * 2))
+            pixels = bytearray(w * h * 2)
+            for row in range(h):
+                image.expand_rows(self.row_buf, row, 1)
+                pixels[row * w * 2:(row + 1) * w * 2] = self.row_buf[:w * 2]
+        else:
+            self.row_buf = None
+            pixels = image
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.key = key
+        self.runs = opaque_runs(pixels, w, h, key)
+        self.visible = True
+        self.drawn = None
+        self.dirty = True
+
+    def invalidate(self):
+        """Redraw the sprite on the next update (e.g. after recoloring)."""
+        self.dirty = True
+
+    def move_to(self, x, y):
+        """Move the sprite.
+
+        Args:
+            x, y (int): New position of top left corner.
+        """
+        self.x = x
+        self.y = y
+
+    def row(self, row):
+        """Return the pixels of one row.
+
+        Args:
+            row (int): Row of sprite.
+        Returns:
+            memoryview: w * 2 bytes of big endian RGB565 pixels.
+        """
+        stride = self.w * 2
+        if self.row_buf is None:
+            return memoryview(self.image)[row * stride:(row + 1) * stride]
+        self.image.expand_rows(self.row_buf, row, 1)
+        return self.row_buf[:stride]
+
+
+class SpriteLayer(object):
+    """Sprites composited over a background that is restored as they move.
+
+    Every update, each moved sprite produces the rectangles that changed:
+    the union of its old and new position when they overlap (one block
+    for erase and draw), otherwise both positions separately.  Each
+    rectangle is rebuilt in RAM from the background source and every
+    sprite touching it, then sent with a single block write, so the panel
+    never shows a half erased sprite.
+
+    Attributes:
+        display: Display object
+        background: RGB565 color or path of a raw RGB565 image at 0, 0
+        bg_width: Width of the background image in pixels
+        sprites: Sprites in drawing order (last is on top)
+        chunk_size: Maximum bytes composited per block
+    """
+
+    def __init__(self, display, background=0, bg_width=None,
+                 chunk_size=8192):
+        """Initialize sprite layer.
+
+        Args:
+            display (Display): Display to draw to.
+            background (Optional int or string): RGB565 color or path of a
+                raw image drawn at 0, 0 (default 0 = black).
+            bg_width (Optional int): Width of the background image
+                (default: display width).
+            chunk_size (Optional int): Maximum bytes composited per block
+                (default 8192).
+        """
+        self.display = display
+        self.background = background
+        self.bg_width = bg_width or display.width
+        self.chunk_size = chunk_size
+        self.sprites = []
+        self.bg_file = None
+        if not isinstance(background, int):
+            # Kept open so restoring a strip is just seeks and reads
+            self.bg_file = open(background, "rb")
+
+    def add(self, sprite):
+        """Add a sprite on top of the others.
+
+        Args:
+            sprite (Sprite): Sprite to add.
+        Returns:
+            Sprite: The sprite.
+        """
+        self.sprites.append(sprite)
+        sprite.dirty = True
+        return sprite
+
+    def close(self):
+        """Close the background image file."""
+        if self.bg_file is not None:
+            self.bg_file.close()
+            self.bg_file = None
+
+    def compose(self, x, y, w, h):
+        """Rebuild a rectangle from the background and sprites and send it.
+
+        Args:
+            x, y (int): Top left corner (on screen).
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+        """
+        display = self.display
+        stride = w * 2
+        chunk_rows = max(self.chunk_size // stride, 1)
+        f = self.bg_file
+        for top in range(y, y + h, chunk_rows):
+            rows = min(chunk_rows, y + h - top)
+            size = rows * stride
+            buf = display.pool.scratch(size, 6)
+            if f is None:
+                buf[:] = display.pool.fill(self.background, size)
+            else:
+                bg_stride = self.bg_width * 2
+                offset = top * bg_stride + x * 2
+                for i in range(0, size, stride):
+                    f.seek(offset)
+                    f.readinto(buf[i:i + stride])
+                    offset += bg_stride
+            for sprite in self.sprites:
+                if not sprite.visible:
+                    continue
+                sx = sprite.x
+                sy = sprite.y
+                row0 = max(top, sy)
+                row1 = min(top + rows, sy + sprite.h)
+                col0 = max(x, sx) - sx
+                col1 = min(x + w, sx + sprite.w) - sx
+                if row0 >= row1 or col0 >= col1:
+                    continue
+                runs = sprite.runs
+                for r in range(row0, row1):
+                    src = sprite.row(r - sy)
+                    # Destination of sprite pixel 0 on this row
+                    base = (r - top) * stride + (sx - x) * 2
+                    for start, end in runs[r - sy]:
+                        if start < col0:
+                            start = col0
+                        if end > col1:
+                            end = col1
+                        if start < end:
+                            buf[base + start * 2:base + end * 2] = \
+                                src[start * 2:end * 2]
+            display.block(x, top, x + w - 1, top + rows - 1, buf)
+
+    def remove(self, sprite):
+        """Remove a sprite, restoring the background under it.
+
+        Args:
+            sprite (Sprite): Sprite to remove.
+        """
+        self.sprites.remove(sprite)
+        if sprite.drawn is not None:
+            self.compose(*sprite.drawn)
+            sprite.drawn = None
+
+    def update(self):
+        """Redraw every sprite that moved, changed or was hidden."""
+        display = self.display
+        rects = []
+        for sprite in self.sprites:
+            old = sprite.drawn
+            new = None
+            if sprite.visible:
+                new = display.clip_rect(sprite.x, sprite.y,
+                                        sprite.w, sprite.h)
+                if new[2] <= 0 or new[3] <= 0:
+                    new = None
+            if new == old and not sprite.dirty:
+                continue
+            sprite.drawn = new
+            sprite.dirty = False
+            if old is not None and new is not None:
+                x0 = min(old[0], new[0])
+                y0 = min(old[1], new[1])
+                x1 = max(old[0] + old[2], new[0] + new[2])
+                y1 = max(old[1] + old[3], new[1] + new[3])
+                if (x1 - x0 < old[2] + new[2] and
+                        y1 - y0 < old[3] + new[3]):
+                    # Overlapping: erase and draw in one rectangle
+                    rects.append((x0, y0, x1 - x0, y1 - y0))
+                    continue
+            if old is not None:
+                rects.append(old)
+            if new is not None:
+                rects.append(new)
+        for rect in rects:
+            self.compose(*rect)
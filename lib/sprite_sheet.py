@@ -0,0 +1,252 @@
+"""Sprite sheet format and animation player.
+
+File layout (little endian header, 10 bytes):
+    magic (4 bytes): b'SPS1'
+    width (uint16): Frame width in pixels
+    height (uint16): Frame height in pixels
+    frame_count (uint16): Number of frames
+
+followed by one 6 byte entry per frame:
+    duration (uint16): Time the frame is shown in milliseconds
+    hotspot_x (int16): X coordinate of the frame's anchor pixel
+    hotspot_y (int16): Y coordinate of the frame's anchor pixel
+
+and the frames as big endian RGB565 pixels (width * height * 2 bytes
+each).  Frames are drawn with their hotspot at the animation position, so
+frames can shift (e.g. bob up and down) without the caller knowing.
+
+Build from raw frames on the host with:
+    python3 lib/sprite_sheet.py output.sps width height duration frame.raw...
+where a frame may be given as frame.raw@x,y to set its hotspot.
+"""
+from array import array
+from struct import pack, unpack
+
+MAGIC = b'SPS1'
+HEADER_SIZE = 10
+ENTRY_SIZE = 6
+
+
+class SpriteSheet(object):
+    """Frames of equal size stored in one file.
+
+    Attributes:
+        width: Width of frames in pixels
+        height: Height of frames in pixels
+        frame_count: Number of frames
+        frame_size: Bytes per frame
+        durations: Display time of each frame in milliseconds
+        hotspots: Anchor (x, y) of each frame
+        frames: All frame pixels when preloaded, otherwise None
+    """
+
+    def __init__(self, path, preload_budget=8192):
+        """Open a sprite sheet.
+
+        Args:
+            path (string): Sprite sheet file path.
+            preload_budget (Optional int): Sheets with at most this many
+                bytes of pixels are read into RAM and the file is closed,
+                larger ones are read a frame at a time (default 8192).
+        """
+        self.file = open(path, "rb")
+        f = self.file
+        magic, w, h, count = unpack('<4sHHH', f.read(HEADER_SIZE))
+        if magic != MAGIC:
+            f.close()
+            raise ValueError('Not an SPS1 sprite sheet.')
+        self.width = w
+        self.height = h
+        self.frame_count = count
+        self.frame_size = w * h * 2
+        self.durations = array('H')
+        self.hotspots = []
+        table = f.read(count * ENTRY_SIZE)
+        for i in range(0, count * ENTRY_SIZE, ENTRY_SIZE):
+            duration, hx, hy = unpack('<Hhh', table[i:i + ENTRY_SIZE])
+            self.durations.append(duration)
+            self.hotspots.append((hx, hy))
+        self.data_offset = HEADER_SIZE + count * ENTRY_SIZE
+        self.frames = None
+        if count * self.frame_size <= preload_budget:
+            self.frames = memoryview(f.read(count * self.frame_size))
+            self.close()
+
+    def close(self):
+        """Close the sheet file (frames can no longer be read)."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def frame(self, index, buf=None):
+        """Return the pixels of a frame.
+
+        Args:
+            index (int): Frame number.
+            buf (Optional memoryview): frame_size bytes to read the frame
+                into (required unless the sheet is preloaded).
+        Returns:
+            memoryview: Big endian RGB565 pixels of the frame.
+        """
+        size = self.frame_size
+        if self.frames is not None:
+            return self.frames[index * size:(index + 1) * size]
+        self.file.seek(self.data_offset + index * size)
+        self.file.readinto(buf)
+        return buf
+
+
+class Animation(object):
+    """Plays the frames of a sprite sheet on a clock.
+
+    Attributes:
+        sheet: SpriteSheet being played
+        index: Current frame number
+        loop: True to start over after the last frame
+        done: True once a non looping animation showed its last frame
+        pixels: Pixels of the current frame
+
+    Note:
+        Unless the sheet is preloaded only two frame buffers are kept: the
+        current frame and the next one, which is read as soon as the
+        current frame is shown.
+    """
+
+    def __init__(self, sheet, loop=True):
+        """Start an animation at its first frame.
+
+        Args:
+            sheet (SpriteSheet): Frames to play.
+            loop (Optional bool): Repeat forever (default True).
+        """
+        self.sheet = sheet
+        self.loop = loop
+        self.done = False
+        self.elapsed = 0
+        self.bufs = None
+        if sheet.frames is None:
+            size = sheet.frame_size
+            self.bufs = [memoryview(bytearray(size)),
+                         memoryview(bytearray(size))]
+        self.next_index = -1
+        self.show(0)
+
+    def next_frame(self, index):
+        """Return the frame after index (-1 at the end of a single run).
+
+        Args:
+            index (int): Frame number.
+        Returns:
+            int: Following frame number.
+        """
+        index += 1
+        if index < self.sheet.frame_count:
+            return index
+        return 0 if self.loop else -1
+
+    def position(self, x, y):
+        """Return where to draw the current frame.
+
+        Args:
+            x, y (int): Animation position.
+        Returns:
+            (int, int): Top left corner placing the frame's hotspot at x, y.
+        """
+        hx, hy = self.sheet.hotspots[self.index]
+        return x - hx, y - hy
+
+    def show(self, index):
+        """Make a frame current and read the one after it.
+
+        Args:
+            index (int): Frame number.
+        """
+        sheet = self.sheet
+        self.index = index
+        bufs = self.bufs
+        if bufs is None:
+            self.pixels = sheet.frame(index)
+            return
+        if index == self.next_index:
+            # Prefetched into the spare buffer
+            bufs.reverse()
+        else:
+            sheet.frame(index, bufs[0])
+        self.pixels = bufs[0]
+        self.next_index = self.next_frame(index)
+        if self.next_index != -1:
+            sheet.frame(self.next_index, bufs[1])
+
+    def update(self, dt):
+        """Advance the clock.
+
+        Args:
+            dt (int): Milliseconds since the last update.
+        Returns:
+            bool: True if the current frame changed.
+        """
+        if self.done:
+            return False
+        durations = self.sheet.durations
+        elapsed = self.elapsed + dt
+        index = self.index
+        while elapsed >= max(durations[index], 1):
+            following = self.next_frame(index)
+            if following == -1:
+                self.done = True
+                break
+            elapsed -= max(durations[index], 1)
+            index = following
+        self.elapsed = elapsed
+        if index == self.index:
+            return False
+        self.show(index)
+        return True
+
+
+def encode(frames, w, h, durations, hotspots=None):
+    """Encode frames as a sprite sheet.
+
+    Args:
+        frames ([bytes]): Big endian RGB565 pixels of each frame.
+        w (int): Width of frames.
+        h (int): Height of frames.
+        durations ([int]): Display time of each frame in milliseconds.
+        hotspots (Optional [(int, int)]): Anchor of each frame
+            (default: top left).
+    Returns:
+        bytes: Sprite sheet file contents.
+    """
+    size = w * h * 2
+    if hotspots is None:
+        hotspots = [(0, 0)] * len(frames)
+    out = bytearray(pack('<4sHHH', MAGIC, w, h, len(frames)))
+    for duration, (hx, hy) in zip(durations, hotspots):
+        out += pack('<Hhh', duration, hx, hy)
+    for data in frames:
+        if len(data) != size:
+            raise ValueError('Frame is not {0} bytes.'.format(size))
+        out += data
+    return bytes(out)
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) < 6:
+        print('Usage: sprite_sheet.py output.sps width height duration '
+              'frame.raw...')
+        sys.exit(1)
+    frames = []
+    hotspots = []
+    for arg in sys.argv[5:]:
+        frame_path, _, hotspot = arg.partition('@')
+        with open(frame_path, 'rb') as f:
+            frames.append(f.read())
+        hotspots.append(tuple(int(n) for n in hotspot.split(','))
+                        if hotspot else (0, 0))
+    encoded = encode(frames, int(sys.argv[2]), int(sys.argv[3]),
+                     [int(sys.argv[4])] * len(frames), hotspots)
+    with open(sys.argv[1], 'wb') as f:
+        f.write(encoded)
+    print('{0}: {1} frames, {2} bytes'.format(sys.argv[1], len(frames),
+                                              len(encoded)))
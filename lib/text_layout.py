@@ -0,0 +1,222 @@
+"""Word wrapping by pixel width with cached layouts."""
+
+LEFT = 0
+CENTER = 1
+RIGHT = 2
+
+CACHE_SIZE = 16  # Number of layouts kept by layout_text
+
+_cache = {}
+_cache_order = []
+
+
+class FixedFont(object):
+    """Metrics of a monospaced font without glyph data (e.g. the built-in
+    8x8 font used by Display.draw_text8x8), for laying out text.
+
+    Attributes:
+        width: Width of every letter in pixels
+        height: Height of letters in pixels
+    """
+
+    def __init__(self, width=8, height=8):
+        """Constructor for fixed font metrics.
+
+        Args:
+            width (Optional int): Letter width (default 8).
+            height (Optional int): Letter height (default 8).
+        """
+        self.width = width
+        self.height = height
+
+    def measure_text(self, text, spacing=1):
+        """Measure length of text string in pixels.
+
+        Args:
+            text (string): Text string to measure
+            spacing (optional int): Pixel spacing between letters.  Default: 1.
+        Returns:
+            int: length of text
+        """
+        return len(text) * (self.width + spacing)
+
+
+class TextLayout(object):
+    """Text broken into lines that fit a box.
+
+    Words are separated by spaces and joined by single spaces, newlines
+    force a line break and words wider than the box are split between
+    letters.  Widths come from font.measure_text, so proportional fonts
+    fill the box.
+
+    Attributes:
+        font: Font the text was measured with
+        spacing: Pixels between letters
+        lines: List of (text, x, y, width) for every line, x and y relative
+            to the top left of the box
+        width: Width of the box
+        height: Height of the laid out lines in pixels
+        line_height: Distance between the tops of consecutive lines
+        end: Index in the text after the last letter laid out (len(text)
+            unless truncated)
+        truncated: True if the text did not fit in max_lines
+    """
+
+    def __init__(self, text, font, width, max_lines=None, align=LEFT,
+                 line_height=None, spacing=1, ellipsis='...'):
+        """Lay out text.
+
+        Args:
+            text (string): Text to lay out.
+            font (XglcdFont or FixedFont): Font providing measure_text and
+                height.
+            width (int): Width of the box in pixels.
+            max_lines (Optional int): Maximum number of lines (default:
+                unlimited).
+            align (Optional int): LEFT, CENTER or RIGHT (default LEFT).
+            line_height (Optional int): Distance between lines (default:
+                font height).
+            spacing (Optional int): Pixels between letters (default 1).
+            ellipsis (Optional string): Appended to the last line when the
+                text is truncated ('' to cut it off, default '...').
+        """
+        self.font = font
+        self.spacing = spacing
+        self.width = width
+        self.line_height = line_height or font.height
+        self.truncated = False
+        self.end = len(text)
+        measure = font.measure_text
+        # measure_text counts spacing after the last letter
+        space = measure(' ', spacing)
+        lines = []  # (index of first letter, text, width)
+        line = None
+        start = 0
+        line_width = 0
+        n = len(text)
+        i = 0
+        while i < n:
+            c = text[i]
+            if c == ' ':
+                i += 1
+                continue
+            if c == '\n':
+                if line is None:
+                    lines.append((i, '', 0))
+                else:
+                    lines.append((start, line, line_width))
+                line = None
+                i += 1
+                continue
+            j = i
+            while j < n and text[j] != ' ' and text[j] != '\n':
+                j += 1
+            word = text[i:j]
+            word_width = measure(word, spacing)
+            if line is not None:
+                if line_width + space + word_width - spacing <= width:
+                    line += ' ' + word
+                    line_width += space + word_width
+                    i = j
+                    continue
+                lines.append((start, line, line_width))
+            # Split words wider than the box between letters
+            while word_width - spacing > width and len(word) > 1:
+                cut = len(word) - 1
+                while (cut > 1 and
+                       measure(word[:cut], spacing) - spacing > width):
+                    cut -= 1
+                lines.append((i, word[:cut], measure(word[:cut], spacing)))
+                i += cut
+                word = word[cut:]
+                word_width = measure(word, spacing)
+            line = word
+            start = i
+            line_width = word_width
+            i = j
+        if line is not None:
+            lines.append((start, line, line_width))
+        if max_lines is not None and len(lines) > max_lines:
+            self.truncated = True
+            self.end = lines[max_lines][0]
+            del lines[max_lines:]
+        if self.truncated and lines and ellipsis:
+            start, last, _ = lines[-1]
+            last_width = measure(last + ellipsis, spacing)
+            while last and last_width - spacing > width:
+                last = last[:-1].rstrip(' ')
+                last_width = measure(last + ellipsis, spacing)
+            lines[-1] = (start, last + ellipsis, last_width)
+        self.lines = []
+        y = 0
+        for _, line, line_width in lines:
+            line_width -= spacing if line else 0
+            if align == CENTER:
+                x = (width - line_width) // 2
+            elif align == RIGHT:
+                x = width - line_width
+            else:
+                x = 0
+            self.lines.append((line, x, y, line_width))
+            y += self.line_height
+        self.height = (y - self.line_height + font.height) if lines else 0
+
+    def draw(self, display, x, y, color, background=0):
+        """Draw the lines with an XglcdFont.
+
+        Args:
+            display (Display): Display to draw to.
+            x, y (int): Top left corner of the box.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+        """
+        for text, lx, ly, _ in self.lines:
+            if text:
+                display.draw_text(x + lx, y + ly, text, self.font, color,
+                                  background, spacing=self.spacing)
+
+
+def layout_text(text, font, width, height=None, align=LEFT, line_height=None,
+                spacing=1, ellipsis='...'):
+    """Lay out text in a box, reusing the result of identical calls.
+
+    Args:
+        text (string): Text to lay out.
+        font (XglcdFont or FixedFont): Font.
+        width (int): Width of the box in pixels.
+        height (Optional int): Height of the box in pixels, lines that do
+            not fit are truncated (default: unlimited).
+        align (Optional int): LEFT, CENTER or RIGHT (default LEFT).
+        line_height (Optional int): Distance between lines (default: font
+            height).
+        spacing (Optional int): Pixels between letters (default 1).
+        ellipsis (Optional string): Marks truncated text (default '...').
+    Returns:
+        TextLayout: Layout (shared between callers, do not modify).
+    Note:
+        The last CACHE_SIZE layouts are kept, so redrawing or paging through
+        the same text does not measure it again.
+    """
+    key = (text, font, width, height, align, line_height, spacing, ellipsis)
+    layout = _cache.get(key)
+    if layout is not None:
+        _cache_order.remove(key)
+        _cache_order.append(key)
+        return layout
+    max_lines = None
+    if height is not None:
+        step = line_height or font.height
+        max_lines = max((height - font.height) // step + 1, 0)
+    layout = TextLayout(text, font, width, max_lines, align, line_height,
+                        spacing, ellipsis)
+    _cache[key] = layout
+    _cache_order.append(key)
+    if len(_cache_order) > CACHE_SIZE:
+        del _cache[_cache_order.pop(0)]
+    return layout
+
+
+def clear_layouts():
+    """Forget all cached layouts."""
+    _cache.clear()
+    del _cache_order[:]
@@ -1,16 +1,55 @@
-"""XGLCD Font Utility."""
-from math import ceil, floor
+"""XGLCD Font Utility.
+
+Binary font layout (little endian header, 10 bytes):
+    magic (4 bytes): b'XGF1'
+    width (uint8): Maximum letter width in pixels
+    height (uint8): Letter height in pixels
+    start_letter (uint8): ASCII number of first letter
+    bpp (uint8): Bits per pixel, 0 or 1 for X-GLCD bitmaps, 2 or 4 for
+        anti-aliased fonts
+    letter_count (uint16): Number of letters
+
+followed by a width table (one uint8 per letter), an offset index (one
+uint16 per letter, relative to the end of the index) and the glyph data,
+so a font holds at most 64 KB of glyph data.
+1-bit letters are width * ceil(height / 8) column bytes in X-GLCD order.
+Anti-aliased letters are height rows of ceil(width * bpp / 8) bytes of
+alpha levels, most significant bits first.
+
+Convert an X-GLCD 'C' file or rasterize a TrueType font (needs Pillow)
+on the host with:
+    python3 lib/xglcd_font.py input.c output.xgf width height
+    python3 lib/xglcd_font.py input.ttf output.xgf size bpp
+"""
+from array import array
+from math import floor
+from struct import pack, unpack
+
+MAGIC = b'XGF1'
+HEADER_SIZE = 10
+MAX_DATA_SIZE = 0x10000  # Glyph data addressable by the uint16 offsets
 
 
 class XglcdFont(object):
     """Font data in X-GLCD format.
 
     Attributes:
-        letters: A bytearray of letters (columns consist of bytes)
+        letters: A bytearray of letters (columns consist of bytes), None
+            for binary fonts
+        widths: A bytearray of letter widths
         width: Maximum pixel width of font
         height: Pixel height of font
         start_letter: ASCII number of first letter
         height_bytes: How many bytes comprises letter height
+        bpp: Bits per pixel (1, or 2 and 4 for anti-aliased fonts)
+        cache: Dict of (letter, color, background, landscape) to rendered
+            (pixel data, width)
+        cache_order: Cached keys, least recently used first
+        cache_budget: Maximum bytes of rendered letters kept
+        hits: Letters served from the cache
+        misses: Letters that had to be rendered
+        tables: Dict of (color, background) to pixel expansion table
+        runs: Dict of letter index and orientation to table runs
 
     Note:
         Font files can be generated with the free version of MikroElektronika
@@ -18,28 +57,77 @@ class XglcdFont(object):
         The font file must be in X-GLCD 'C' format.
         To save text files from this font creator program in Win7 or higher
         you must use XP compatibility mode or you can just use the clipboard.
+        Binary fonts (see convert) load only their width table and offset
+        index, glyph bytes are read from the file the first time a letter
+        is rendered.  Anti-aliased letters are drawn with a table of
+        colors blended between background and color, so they cost about
+        the same as 1-bit letters.
     """
 
-    # Dict to translate bitwise values to byte position
-    BIT_POS = {1: 0, 2: 2, 4: 4, 8: 6, 16: 8, 32: 10, 64: 12, 128: 14, 256: 16}
+    # Number of color pairs with a cached expansion table (up to 4 KB each)
+    TABLE_COUNT = 2
 
-    def __init__(self, path, width, height, start_letter=32, letter_count=96):
+    def __init__(self, path, width=None, height=None, start_letter=32,
+                 letter_count=96, cache_budget=8192):
         """Constructor for X-GLCD Font object.
 
         Args:
-            path (string): Full path of font file
+            path (string): Full path of font file ('C' or binary)
             width (int): Maximum width in pixels of each letter
+                (read from the header of binary fonts)
             height (int): Height in pixels of each letter
+                (read from the header of binary fonts)
             start_letter (int): First ASCII letter.  Default is 32.
             letter_count (int): Total number of letters.  Default is 96.
+            cache_budget (int): Bytes of rendered letters to keep, 0 turns
+                the cache off.  Default is 8192.
+        """
+        self.path = path
+        self.cache = {}
+        self.cache_order = []
+        self.cache_used = 0
+        self.cache_budget = cache_budget
+        self.hits = 0
+        self.misses = 0
+        self.tables = {}
+        self.table_order = []
+        self.runs = {}
+        self.bpp = 1
+        if path.endswith('.c'):
+            self.width = width
+            self.height = max(height, 8)
+            self.start_letter = start_letter
+            self.letter_count = letter_count
+            self.bytes_per_letter = (floor(
+                (self.height - 1) / 8) + 1) * self.width + 1
+            self.__load_xglcd_font(path)
+            self.widths = bytearray(self.letters[i * self.bytes_per_letter]
+                                    for i in range(letter_count))
+        else:
+            self.__load_binary_font(path)
+
+    def __load_binary_font(self, path):
+        """Load the header, width table and offset index of a binary font.
+
+        Args:
+            path (string): Full path of font file.
         """
-        self.width = width
-        self.height = max(height, 8)
-        self.start_letter = start_letter
-        self.letter_count = letter_count
-        self.bytes_per_letter = (floor(
-            (self.height - 1) / 8) + 1) * self.width + 1
-        self.__load_xglcd_font(path)
+        with open(path, 'rb') as f:
+            magic, width, height, start_letter, bpp, letter_count = unpack(
+                '<4sBBBBH', f.read(HEADER_SIZE))
+            if magic != MAGIC:
+                raise ValueError('Not an XGF1 font.')
+            self.bpp = bpp or 1
+            if self.bpp not in (1, 2, 4):
+                raise ValueError('Unsupported bpp {0}.'.format(bpp))
+            self.width = width
+            self.height = max(height, 8) if self.bpp == 1 else height
+            self.start_letter = start_letter
+            self.letter_count = letter_count
+            self.letters = None
+            self.widths = bytearray(f.read(letter_count))
+            self.offsets = array('H', f.read(letter_count * 2))
+        self.data_offset = HEADER_SIZE + letter_count * 3
 
     def __load_xglcd_font(self, path):
         """Load X-GLCD font data from text file.
@@ -70,14 +158,162 @@ class XglcdFont(object):
                     int(b, 16) for b in line.split(','))
                 offset += bytes_per_letter
 
-    def lit_bits(self, n):
-        """Return positions of 1 bits only."""
-        while n:
-            b = n & (~n+1)
-            yield self.BIT_POS[b]
-            n ^= b
+    def expansion_table(self, color, background):
+        """Return the table expanding a byte of bits to 8 pixels.
 
-    def get_letter(self, letter, color, background=0, landscape=False):
+        Args:
+            color (int): RGB565 color of set bits.
+            background (int): RGB565 color of clear bits.
+        Returns:
+            memoryview: 256 entries of 16 bytes, bit 0 is the first pixel
+                (see blend_table for anti-aliased fonts).
+        """
+        key = (color, background)
+        table = self.tables.get(key)
+        if table is not None:
+            return table
+        if self.bpp == 1:
+            table = bit_table(color, background)
+        else:
+            table = self.blend_table(color, background)
+        if len(self.table_order) >= self.TABLE_COUNT:
+            del self.tables[self.table_order.pop(0)]
+        self.tables[key] = table
+        self.table_order.append(key)
+        return table
+
+    def blend_table(self, color, background):
+        """Build the table expanding a byte of alpha levels to pixels.
+
+        Args:
+            color (int): RGB565 color of full coverage.
+            background (int): RGB565 color of no coverage.
+        Returns:
+            memoryview: 256 entries of 8 // bpp pixels, most significant
+                bits are the first pixel.
+        """
+        bpp = self.bpp
+        levels = (1 << bpp) - 1
+        br = background >> 11
+        bg = (background >> 5) & 0x3F
+        bb = background & 0x1F
+        dr = (color >> 11) - br
+        dg = ((color >> 5) & 0x3F) - bg
+        db = (color & 0x1F) - bb
+        ramp = []
+        for a in range(levels + 1):
+            blended = (((br + (dr * a * 2 + levels) // (levels * 2)) << 11) |
+                       ((bg + (dg * a * 2 + levels) // (levels * 2)) << 5) |
+                       (bb + (db * a * 2 + levels) // (levels * 2)))
+            ramp.append(blended.to_bytes(2, 'big'))
+        pixels = 8 // bpp
+        table = memoryview(bytearray(256 * pixels * 2))
+        shifts = range(8 - bpp, -1, -bpp)
+        pos = 0
+        for n in range(256):
+            for shift in shifts:
+                table[pos:pos + 2] = ramp[(n >> shift) & levels]
+                pos += 2
+        return table
+
+    def letter_data(self, letter_ord):
+        """Return the column bytes of a letter.
+
+        Args:
+            letter_ord (int): Index of letter in font.
+        Returns:
+            memoryview or bytes: Column bytes, or alpha rows for
+                anti-aliased fonts.
+        """
+        if self.bpp == 1:
+            size = self.widths[letter_ord] * ((self.height + 7) // 8)
+        else:
+            size = (self.widths[letter_ord] * self.bpp + 7) // 8 * self.height
+        if self.letters is not None:
+            offset = letter_ord * self.bytes_per_letter + 1
+            return memoryview(self.letters)[offset:offset + size]
+        with open(self.path, 'rb') as f:
+            f.seek(self.data_offset + self.offsets[letter_ord])
+            return f.read(size)
+
+    def get_runs(self, letter_ord, landscape):
+        """Return where each non-empty font byte lands in the pixel data.
+
+        Args:
+            letter_ord (int): Index of letter in font.
+            landscape (bool): Orientation.
+        Returns:
+            array: Flat (position, table offset, length) byte triples, one
+                per run of up to 8 pixels with at least one set bit.
+        Note:
+            Runs don't depend on color so they are built once per letter.
+            Portrait rows are packed from the column bytes first.
+        """
+        key = letter_ord << 1 | landscape
+        runs = self.runs.get(key)
+        if runs is not None:
+            return runs
+        letters = self.letter_data(letter_ord)
+        letter_width = self.widths[letter_ord]
+        height = self.height
+        height_bytes = (height + 7) // 8
+        runs = array('H')
+        if self.bpp > 1:
+            bpp = self.bpp
+            pixels = 8 // bpp
+            step = pixels * 2
+            i = 0
+            for row in range(height):
+                for col in range(0, letter_width, pixels):
+                    b = letters[i]
+                    i += 1
+                    if not b:
+                        continue
+                    if not landscape:
+                        runs.extend(((row * letter_width + col) * 2, b * step,
+                                     min(pixels, letter_width - col) * 2))
+                        continue
+                    # Landscape rows are columns, so each pixel is its own
+                    # run, taken from the first pixel of a table entry
+                    for k in range(min(pixels, letter_width - col)):
+                        level = (b >> (8 - bpp * (k + 1))) & ((1 << bpp) - 1)
+                        if level:
+                            pos = ((letter_width - 1 - col - k) * height +
+                                   row) * 2
+                            runs.extend((pos, (level << (8 - bpp)) * step, 2))
+        elif landscape:
+            # Font bytes run down each column, which is a landscape row.
+            # The first column is the bottom row.
+            i = 0
+            for col in range(letter_width):
+                pos = (letter_width - 1 - col) * height * 2
+                for row in range(0, height, 8):
+                    if letters[i]:
+                        runs.extend((pos + row * 2, letters[i] << 4,
+                                     min(8, height - row) * 2))
+                    i += 1
+        else:
+            row_bytes = (letter_width + 7) // 8
+            bits = bytearray(height * row_bytes)
+            for col in range(letter_width):
+                mask = 1 << (col & 7)
+                base = col * height_bytes
+                for row in range(height):
+                    if letters[base + (row >> 3)] >> (row & 7) & 1:
+                        bits[row * row_bytes + (col >> 3)] |= mask
+            i = 0
+            for row in range(height):
+                for col in range(0, letter_width, 8):
+                    if bits[i]:
+                        runs.extend(((row * letter_width + col) * 2,
+                                     bits[i] << 4,
+                                     min(8, letter_width - col) * 2))
+                    i += 1
+        self.runs[key] = runs
+        return runs
+
+    def get_letter(self, letter, color, background=0, landscape=False,
+                   pool=None):
         """Convert letter byte data to pixels.
 
         Args:
@@ -85,72 +321,96 @@ class XglcdFont(object):
             color (int): RGB565 color value.
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
+            pool (BufferPool): Render into the pool's glyph scratch buffer
+                instead of allocating (default: None).
         Returns:
             (bytearray): Pixel data.
             (int, int): Letter width and height.
+        Note:
+            Rendered letters are kept in an LRU cache, so the returned
+            buffer must not be modified.  Letters too large for the cache
+            are rendered into the pool (reused by the next call) if given.
         """
+        key = (letter, color, background, landscape)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            order = self.cache_order
+            if order[-1] != key:
+                order.remove(key)
+                order.append(key)
+            return cached[0], cached[1], self.height
         # Get index of letter
         letter_ord = ord(letter) - self.start_letter
         # Confirm font contains letter
         if letter_ord >= self.letter_count:
             print('Font does not contain character: ' + letter)
             return b'', 0, 0
-        bytes_per_letter = self.bytes_per_letter
-        offset = letter_ord * bytes_per_letter
-        mv = memoryview(self.letters[offset:offset + bytes_per_letter])
-
-        # Get width of letter (specified by first byte)
-        letter_width = mv[0]
+        self.misses += 1
+        letter_width = self.widths[letter_ord]
         letter_height = self.height
         # Get size in bytes of specified letter
         letter_size = letter_height * letter_width
         # Create buffer (double size to accommodate 16 bit colors)
-        if background:
+        cache = letter_size * 2 <= self.cache_budget
+        if pool is not None and not cache:
+            buf = pool.scratch(letter_size * 2, 1)
+            buf[:] = pool.fill(background, letter_size * 2)
+        elif background:
             buf = bytearray(background.to_bytes(2, 'big') * letter_size)
         else:
             buf = bytearray(letter_size * 2)
 
-        msb, lsb = color.to_bytes(2, 'big')
-
-        if landscape:
-            # Populate buffer in order for landscape
-            pos = (letter_size * 2) - (letter_height * 2)
-            lh = letter_height
-            # Loop through letter byte data and convert to pixel data
-            for b in mv[1:]:
-                # Process only colored bits
-                for bit in self.lit_bits(b):
-                    buf[bit + pos] = msb
-                    buf[bit + pos + 1] = lsb
-                if lh > 8:
-                    # Increment position by double byte
-                    pos += 16
-                    lh -= 8
-                else:
-                    # Decrease position to start of previous column
-                    pos -= (letter_height * 4) - (lh * 2)
-                    lh = letter_height
-        else:
-            # Populate buffer in order for portrait
-            col = 0  # Set column to first column
-            bytes_per_letter = ceil(letter_height / 8)
-            letter_byte = 0
-            # Loop through letter byte data and convert to pixel data
-            for b in mv[1:]:
-                # Process only colored bits
-                segment_size = letter_byte * letter_width * 16
-                for bit in self.lit_bits(b):
-                    pos = (bit * letter_width) + (col * 2) + segment_size
-                    buf[pos] = msb
-                    pos = (bit * letter_width) + (col * 2) + 1 + segment_size
-                    buf[pos] = lsb
-                letter_byte += 1
-                if letter_byte + 1 > bytes_per_letter:
-                    col += 1
-                    letter_byte = 0
+        # Copy whole runs of up to 8 pixels from the expansion table
+        table = self.expansion_table(color, background)
+        runs = self.get_runs(letter_ord, landscape)
+        for i in range(0, len(runs), 3):
+            pos = runs[i]
+            start = runs[i + 1]
+            n = runs[i + 2]
+            buf[pos:pos + n] = table[start:start + n]
 
+        if cache:
+            # Evict least recently used letters to stay within budget
+            while self.cache_used + letter_size * 2 > self.cache_budget:
+                old = self.cache_order.pop(0)
+                self.cache_used -= len(self.cache.pop(old)[0])
+            self.cache[key] = (buf, letter_width)
+            self.cache_order.append(key)
+            self.cache_used += letter_size * 2
         return buf, letter_width, letter_height
 
+    def cache_stats(self):
+        """Return glyph cache statistics.
+
+        Returns:
+            dict: Hits, misses, cached letters and bytes.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_letters': len(self.cache_order),
+            'cached_bytes': self.cache_used,
+        }
+
+    def clear_cache(self):
+        """Drop all cached letters."""
+        self.cache = {}
+        self.cache_order = []
+        self.cache_used = 0
+
+    def prewarm(self, text, color, background=0, landscape=False):
+        """Render letters into the cache ahead of time.
+
+        Args:
+            text (string): Letters to cache, e.g. "0123456789$.:apm".
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait)
+        """
+        for letter in text:
+            self.get_letter(letter, color, background, landscape)
+
     def measure_text(self, text, spacing=1):
         """Measure length of text string in pixels.
 
@@ -159,12 +419,154 @@ class XglcdFont(object):
             spacing (optional int): Pixel spacing between letters.  Default: 1.
         Returns:
             int: length of text
+        Note:
+            Letters missing from the font have no width (draw_text does
+            not draw them either).
         """
         length = 0
+        widths = self.widths
+        start_letter = self.start_letter
+        letter_count = self.letter_count
         for letter in text:
-            # Get index of letter
-            letter_ord = ord(letter) - self.start_letter
-            offset = letter_ord * self.bytes_per_letter
-            # Add length of letter and spacing
-            length += self.letters[offset] + spacing
+            index = ord(letter) - start_letter
+            if 0 <= index < letter_count:
+                # Add length of letter and spacing
+                length += widths[index] + spacing
         return length
+
+
+def bit_table(color, background):
+    """Build the table expanding a byte of bits to 8 pixels.
+
+    Args:
+        color (int): RGB565 color of set bits.
+        background (int): RGB565 color of clear bits.
+    Returns:
+        memoryview: 256 entries of 16 bytes, bit 0 is the first pixel.
+    """
+    pair = (background.to_bytes(2, 'big'), color.to_bytes(2, 'big'))
+    nibbles = [b''.join(pair[(n >> i) & 1] for i in range(4))
+               for n in range(16)]
+    table = memoryview(bytearray(4096))
+    pos = 0
+    for n in range(256):
+        table[pos:pos + 8] = nibbles[n & 0xF]
+        table[pos + 8:pos + 16] = nibbles[n >> 4]
+        pos += 16
+    return table
+
+
+def check_data_size(size):
+    """Raise ValueError if glyph data is too large for the binary format.
+
+    Args:
+        size (int): Bytes of glyph data.
+    """
+    if size > MAX_DATA_SIZE:
+        raise ValueError('Glyph data is {0} bytes, XGF1 fonts are limited to '
+                         '64 KB (use a smaller size, bpp or letter_count).'
+                         .format(size))
+
+
+def convert(font):
+    """Encode a font in the binary format.
+
+    Args:
+        font (XglcdFont): Loaded font.
+    Returns:
+        bytes: Font file contents.
+    """
+    count = font.letter_count
+    letters = [font.letter_data(letter_ord) for letter_ord in range(count)]
+    check_data_size(sum(len(letter) for letter in letters))
+    offsets = array('H')
+    data = bytearray()
+    for letter in letters:
+        offsets.append(len(data))
+        data.extend(letter)
+    header = pack('<4sBBBBH', MAGIC, font.width, font.height,
+                  font.start_letter, font.bpp, count)
+    return header + bytes(font.widths) + offsets.tobytes() + bytes(data)
+
+
+def encode_alpha(glyphs, height, bpp, start_letter=32):
+    """Encode 8-bit coverage bitmaps as an anti-aliased binary font.
+
+    Args:
+        glyphs ([(int, bytes)]): Width and row major 0-255 coverage
+            (width * height bytes) of each letter.
+        height (int): Letter height in pixels.
+        bpp (int): Bits per pixel (2 or 4).
+        start_letter (int): ASCII number of first letter (default 32).
+    Returns:
+        bytes: Font file contents.
+    """
+    if bpp not in (2, 4):
+        raise ValueError('bpp must be 2 or 4.')
+    check_data_size(sum((width * bpp + 7) // 8 * height
+                        for width, _ in glyphs))
+    levels = (1 << bpp) - 1
+    widths = bytearray()
+    offsets = array('H')
+    data = bytearray()
+    for width, coverage in glyphs:
+        widths.append(width)
+        offsets.append(len(data))
+        for row in range(height):
+            b = 0
+            n = 0
+            for col in range(width):
+                level = (coverage[row * width + col] * levels + 127) // 255
+                b = b << bpp | level
+                n += bpp
+                if n == 8:
+                    data.append(b)
+                    b = n = 0
+            if n:
+                data.append(b << (8 - n))
+    header = pack('<4sBBBBH', MAGIC, max(widths), height, start_letter, bpp,
+                  len(glyphs))
+    return header + bytes(widths) + offsets.tobytes() + bytes(data)
+
+
+def rasterize_ttf(path, size, bpp, start_letter=32, letter_count=96):
+    """Rasterize a TrueType font as an anti-aliased binary font (host only).
+
+    Args:
+        path (string): TrueType or OpenType font file.
+        size (int): Font size in pixels.
+        bpp (int): Bits per pixel (2 or 4).
+        start_letter (int): ASCII number of first letter (default 32).
+        letter_count (int): Number of letters (default 96).
+    Returns:
+        bytes: Font file contents.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    font = ImageFont.truetype(path, size)
+    ascent, descent = font.getmetrics()
+    height = ascent + descent
+    glyphs = []
+    for code in range(start_letter, start_letter + letter_count):
+        letter = chr(code)
+        width = max(int(round(font.getlength(letter))), 1)
+        image = Image.new('L', (width, height))
+        ImageDraw.Draw(image).text((0, 0), letter, font=font, fill=255)
+        glyphs.append((width, image.tobytes()))
+    return encode_alpha(glyphs, height, bpp, start_letter)
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 5:
+        print('Usage: xglcd_font.py input.c output.xgf width height')
+        print('       xglcd_font.py input.ttf output.xgf size bpp')
+        sys.exit(1)
+    if sys.argv[1].endswith('.c'):
+        encoded = convert(XglcdFont(sys.argv[1], int(sys.argv[3]),
+                                    int(sys.argv[4])))
+    else:
+        encoded = rasterize_ttf(sys.argv[1], int(sys.argv[3]),
+                                int(sys.argv[4]))
+    with open(sys.argv[2], 'wb') as f:
+        f.write(encoded)
+    print('{0}: {1} bytes'.format(sys.argv[2], len(encoded)))
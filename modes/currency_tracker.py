@@ -38,11 +38,13 @@ ASSETS = {
 async def run(display:Display, wlan:network.WLAN):
     try:
         print("Loading larger 'monogram' font")
-        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.c', 13, 18)
+        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.xgf')
+        # price redraws only use these letters
+        monogram.prewarm("0123456789$.", WHITE)
         print("Loading smaller 'monogram' font")
-        monogram_small:XglcdFont = XglcdFont('fonts/Monogram7x9.c', 7, 9)
+        monogram_small:XglcdFont = XglcdFont('fonts/Monogram7x9.xgf')
 
-        display.clear()
+        await display.clear_async()
 
         connected = True
 
@@ -2,7 +2,9 @@ from utime import sleep_us, ticks_us, ticks_diff
 import asyncio
 import random
 
-from lib.ili9341 import Display
+from lib.ili9341 import Display, color565
+from lib.indexed_sprite import load_indexed_sprite
+from lib.sprite_layer import Sprite, SpriteLayer
 
 # adapted from https://github.com/rdagger/micropython-ili9341/blob/master/demo_sprite.py
 
@@ -11,10 +13,24 @@ SPRITE_WIDTH = 86
 SPRITE_HEIGHT = 38
 SPRITE_SPEED = 1 # how fast the sprite bounces around
 
+# RGB565 colour or path of a full screen raw image, e.g. "images/scrollable-background.raw"
+BACKGROUND = 0
+
+# logo is recoloured on every bounce (black background is left alone)
+LOGO_COLORS = [
+    color565(30, 203, 218),
+    color565(255, 0, 0),
+    color565(0, 255, 0),
+    color565(255, 255, 0),
+    color565(255, 0, 255),
+    color565(255, 128, 0),
+    color565(255, 255, 255)
+]
+
 class BouncingSprite(object):
     """Bouncing Sprite."""
 
-    def __init__(self, path:str, image_w:int, image_h:int, speed:int, display:Display):
+    def __init__(self, path:str, image_w:int, image_h:int, speed:int, display:Display, layer:SpriteLayer):
         """Initialize sprite.
 
         Args:
@@ -24,8 +40,10 @@ class BouncingSprite(object):
             size (int): Square side length.
             speed(int): Initial XY-Speed of sprite.
             display (SSD1351): OLED display object.
+            layer (SpriteLayer): Layer the sprite is drawn on.
         """
-        self.buf = display.load_sprite(path, image_w, image_h)
+        self.sprite = load_indexed_sprite(path, image_w, image_h)
+        self.color = self.sprite.palette[1]
         self.image_w = image_w
         self.image_h = image_h
         self.display = display
@@ -33,8 +51,8 @@ class BouncingSprite(object):
         self.y_speed = random.choice([-speed, speed])
         self.x = self.display.width // 2 - self.image_w // 2
         self.y = self.display.height // 2 - self.image_h // 2
-        self.prev_x = self.x
-        self.prev_y = self.y
+        # black around the logo is see-through
+        self.layer_sprite = layer.add(Sprite(self.sprite, self.x, self.y, key=0))
 
     def update_pos(self):
         """Update sprite speed and position."""
@@ -45,6 +63,8 @@ class BouncingSprite(object):
         x_speed = abs(self.x_speed)
         y_speed = abs(self.y_speed)
 
+        prev_speeds = (self.x_speed, self.y_speed)
+
         if x + w + x_speed >= self.display.width:
             self.x_speed = -x_speed
         elif x - x_speed < 0:
@@ -55,51 +75,40 @@ class BouncingSprite(object):
         elif y - y_speed <= 0:
             self.y_speed = y_speed
 
-        self.prev_x = x
-        self.prev_y = y
+        if (self.x_speed, self.y_speed) != prev_speeds:
+            self.recolor()
 
         self.x = x + self.x_speed
         self.y = y + self.y_speed
+        self.layer_sprite.move_to(self.x, self.y)
 
-    def draw(self):
-        """Draw sprite."""
-        x = self.x
-        y = self.y
-        prev_x = self.prev_x
-        prev_y = self.prev_y
-        w = self.image_w
-        h = self.image_h
-        x_speed = abs(self.x_speed)
-        y_speed = abs(self.y_speed)
-
-        # determine direction and remove previous portion of sprite
-        if prev_x > x:
-            # left
-            self.display.fill_vrect(x + w, prev_y, x_speed, h, 0)
-        elif prev_x < x:
-            # right
-            self.display.fill_vrect(x - x_speed, prev_y, x_speed, h, 0)
-        if prev_y > y:
-            # upward
-            self.display.fill_vrect(prev_x, y + h, w, y_speed, 0)
-        elif prev_y < y:
-            # downward
-            self.display.fill_vrect(prev_x, y - y_speed, w, y_speed, 0)
-
-        self.display.draw_sprite(self.buf, x, y, w, h)
+    def recolor(self):
+        """Swap the logo to a new colour (palette change only)."""
+        color = self.color
+        while color == self.color:
+            color = random.choice(LOGO_COLORS)
+        self.color = color
+        self.sprite.set_palette([c if c == 0 else color for c in self.sprite.palette])
+        self.layer_sprite.invalidate()
 
 async def run(display:Display):
     try:
-        display.clear()
-        logo = BouncingSprite(SPRITE_PATH, SPRITE_WIDTH, SPRITE_HEIGHT, SPRITE_SPEED, display)
+        layer = SpriteLayer(display, BACKGROUND)
+        if isinstance(BACKGROUND, int):
+            await display.clear_async(BACKGROUND)
+        else:
+            await display.draw_image_async(BACKGROUND)
+        logo = BouncingSprite(SPRITE_PATH, SPRITE_WIDTH, SPRITE_HEIGHT, SPRITE_SPEED, display, layer)
         while True:
             timer = ticks_us()
             logo.update_pos()
-            logo.draw()
+            # erases the uncovered strip and draws the logo in one block
+            layer.update()
             # attempt to set framerate to 30 FPS
             timer_dif = 33333 - ticks_diff(ticks_us(), timer)
             if timer_dif > 0:
                 # sleep_us(timer_dif)
                 await asyncio.sleep(timer_dif / 1000_000)
     except asyncio.CancelledError:
+        layer.close()
         raise
@@ -10,7 +10,7 @@ async def run(display:Display, wlan:WLAN):
     backlight_pin:Pin = Pin(8, Pin.OUT)
 
     try:
-        display.clear()
+        await display.clear_async()
         display.sleep(True)
         backlight_pin.off()
         wlan.config(pm=WLAN.PM_POWERSAVE)
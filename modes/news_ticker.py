@@ -2,6 +2,7 @@ import network
 import asyncio
 
 from lib.ili9341 import Display, color565
+from lib.scroll_viewport import ScrollViewport
 from lib.xglcd_font import XglcdFont
 
 WHITE = color565(255, 255, 255)
@@ -11,21 +12,16 @@ ITERATION_TIME = 0.05 # time between each scroll increment (s)
 async def run(display:Display, wlan:network.WLAN):
     try:
         print("Loading 'monogram' font")
-        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.c', 13, 18)
+        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.xgf')
 
-        scroll_amount = display.width
-
-        display.clear()
-        display.draw_text(10, 10, "FLORIDA MAN", monogram, WHITE)
+        viewport = ScrollViewport(display)
+        await display.clear_async()
+        viewport.draw_text(10, 10, "FLORIDA MAN", monogram, WHITE)
 
         while True:
-            scroll_amount -= 1
-            if scroll_amount == 0:
-                scroll_amount = display.width
-
-            display.scroll(scroll_amount)
+            viewport.scroll_by(1)
             await asyncio.sleep(ITERATION_TIME)
 
     except asyncio.CancelledError:
-        display.scroll(0)
+        viewport.reset()
         raise
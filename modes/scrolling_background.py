@@ -1,87 +1,90 @@
+from utime import ticks_ms, ticks_diff
 import asyncio
 
-from lib.ili9341 import Display, color565
+from lib.ili9341 import Display, color565, opaque_runs
+from lib.scroll_viewport import ScrollViewport
+from lib.sprite_sheet import Animation, SpriteSheet
 
 BACKGROUND_IMAGE = "scrollable-background"
 BACKGROUND_SKY_COLOR = color565(70, 52, 94)
 
-BIRD_IMAGE      = const("bird")
-BIRD_WIDTH      = const(40)
-BIRD_HEIGHT     = const(40)
-BIRD_COUNT      = const(8)
+# 8 frames of 40x40, 200 ms each, hotspots make the bird bob up and down
+BIRD_SHEET      = "images/bird.sps"
 BIRD_Y_OFFSET   = const(52)
 BIRD_X_POSITION = const(141) # centre of screen with sprite taken into account
 
 UPDATE_TIME = 0.05 # how long between each screen update (s)
 SCROLL_INCREMENT = 1 # how much the screen is scrolled by (px)
 
-SPRITE_UPDATE_TIME = 4
-
-# left means how many pixels from the left, returns the rest from the right
-def get_y_splits(bird_data:bytes, left:int) -> list[bytearray]:
-    left_bird_slices = [bird_data[i:i + left * 2] for i in range(0, len(bird_data), BIRD_WIDTH * 2)]
-    right_bird_slices = [bird_data[i + left * 2:i + BIRD_WIDTH * 2] for i in range(0, len(bird_data), BIRD_WIDTH * 2)]
-
-    slices = [left_bird_slices, right_bird_slices]
-
+# pixels of the last bird frame that the next one does not cover
+def uncovered_runs(old_runs:list, new_runs:list, dx:int, dy:int) -> list[tuple[int, int, int]]: # (row, start, end) relative to the old frame
     result = []
-
-    for slice in slices:
-        flattened = bytearray()
-        for s in slice:
-            flattened.extend(s)
-        result.append(flattened)
-
+    for row, runs in enumerate(old_runs):
+        new_row = row - dy
+        cover = new_runs[new_row] if 0 <= new_row < len(new_runs) else []
+        for start, end in runs:
+            for cover_start, cover_end in cover:
+                cover_start += dx
+                cover_end += dx
+                if cover_end <= start or cover_start >= end:
+                    continue
+                if cover_start > start:
+                    result.append((row, start, cover_start))
+                start = max(start, cover_end)
+                if start >= end:
+                    break
+            if start < end:
+                result.append((row, start, end))
     return result
 
+def fill_runs(x:int, y:int, display:Display, runs:list[tuple[int, int, int]], color:int):
+    for row, start, end in runs:
+        display.fill_hrect(x + start, y + row, end - start, 1, color)
+
 async def run(display:Display):
     try:
-        display.draw_image(f"images/{BACKGROUND_IMAGE}.raw")
+        # background is as wide as the screen, so it repeats seamlessly
+        viewport = ScrollViewport(display)
+        print('Loading bird sprite sheet')
+        sheet = SpriteSheet(BIRD_SHEET)
+        await display.draw_image_async(f"images/{BACKGROUND_IMAGE}.raw")
 
-        scroll_amount = display.width
+        bird = Animation(sheet)
+        bird_width = sheet.width
+        bird_height = sheet.height
 
-        print('Loading bird image sprites')
-        bird_sprites:list[bytes] = []
-        for i in range(BIRD_COUNT):
-            bird_sprites.append(display.load_sprite(f"images/{BIRD_IMAGE}-{i}.raw", BIRD_WIDTH, BIRD_HEIGHT))
+        # sky around the birds is see-through
+        frame_buf = memoryview(bytearray(sheet.frame_size))
+        bird_runs:list = [opaque_runs(sheet.frame(i, frame_buf), bird_width, bird_height, BACKGROUND_SKY_COLOR) for i in range(sheet.frame_count)]
+        del frame_buf
 
-        bird_index = 0
-        timer = 0
-        bird_y_modifier = 0
+        last_bird = None # (world x, y, index) of the bird on screen
+        last_time = ticks_ms()
 
         while True:
 
-            timer += 1
-            if timer >= SPRITE_UPDATE_TIME:
-                bird_index += 1
-                bird_index %= BIRD_COUNT
-                timer = 0
-
-            # make bird sprite bob up and down
-            if bird_index in [3, 4]:
-                bird_y_modifier = -1
-            elif bird_index in [0, 7]:
-                bird_y_modifier = 1
-            else:
-                bird_y_modifier = 0
-
-            scroll_amount -= SCROLL_INCREMENT
-            if scroll_amount <= 0:
-                scroll_amount = display.width + scroll_amount
-
-            draw_x_position = (BIRD_X_POSITION + display.width - scroll_amount) % display.width
-            if draw_x_position + BIRD_WIDTH >= display.width: # sprite is being drawn over the right edge, must split
-                overshoot = draw_x_position + BIRD_WIDTH - display.width # how much draw over the right edge (px)
-                left_bytes, right_bytes = get_y_splits(bird_sprites[bird_index], BIRD_WIDTH - overshoot)
-                display.draw_sprite(left_bytes, draw_x_position, BIRD_Y_OFFSET + bird_y_modifier, BIRD_WIDTH - overshoot, BIRD_HEIGHT)
-                display.draw_sprite(right_bytes, 0, BIRD_Y_OFFSET + bird_y_modifier, overshoot, BIRD_HEIGHT)
-            else:
-                display.draw_sprite(bird_sprites[bird_index], draw_x_position, BIRD_Y_OFFSET + bird_y_modifier, BIRD_WIDTH, BIRD_HEIGHT)
-
-            display.scroll(scroll_amount)
+            now = ticks_ms()
+            bird.update(ticks_diff(now, last_time))
+            last_time = now
+
+            viewport.scroll_by(SCROLL_INCREMENT)
+
+            # keep the bird at the same screen position as the world scrolls
+            bird_x, bird_y = bird.position(viewport.pos + BIRD_X_POSITION, BIRD_Y_OFFSET)
+            bird_index = bird.index
+
+            # the birds fly over plain sky, so the last frame is erased with the sky colour
+            if last_bird is not None:
+                old_x, old_y, old_index = last_bird
+                erase = uncovered_runs(bird_runs[old_index], bird_runs[bird_index], bird_x - old_x, bird_y - old_y)
+                viewport.draw(fill_runs, old_x, old_y, bird_width, display, erase, BACKGROUND_SKY_COLOR)
+
+            viewport.draw_sprite(bird.pixels, bird_x, bird_y, bird_width, bird_height, bird_runs[bird_index])
+            last_bird = (bird_x, bird_y, bird_index)
 
             await asyncio.sleep(UPDATE_TIME)
 
     except asyncio.CancelledError:
-        display.scroll(0)
+        viewport.reset()
+        sheet.close()
         raise
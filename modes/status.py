@@ -74,9 +74,11 @@ def get_conn_status_text(status:int) -> tuple[str, int]:
 async def run(display:Display, wlan:network.WLAN):
     """Status display"""
     try:
-        display.clear()
+        await display.clear_async()
         print("Loading 'monogram' font")
-        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.c', 13, 18)
+        monogram:XglcdFont = XglcdFont('fonts/Monogram13x18.xgf')
+        # clock and temperature redraws only use these letters
+        monogram.prewarm("0123456789:apmC", WHITE)
 
         display.draw_text(X_OFFSET, Y_OFFSET + Y_DISTANCE * 0, f"Time: ", monogram, WHITE)
         display.draw_text(X_OFFSET, Y_OFFSET + Y_DISTANCE * 1, f"Temperature: ", monogram, WHITE)
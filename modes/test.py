@@ -6,19 +6,65 @@ from lib.xglcd_font import XglcdFont
 WHITE = color565(255, 255, 255)
 TEXT = "Once more, forever."
 
+def polygon_fill_gaps(display:Display, sides:int, r:int, rotate:int=0):
+    """Return the outline pixels of a polygon that fill_polygon leaves uncovered.
+
+    The display's block() is swapped for recorders, so nothing reaches the panel.
+    """
+    width = display.width
+    x0, y0 = width // 2, display.height // 2
+    covered = bytearray((width * display.height + 7) // 8)
+    outline = []
+
+    def record_outline(x0:int, y0:int, x1:int, y1:int, data):
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                outline.append((x, y))
+
+    def record_fill(x0:int, y0:int, x1:int, y1:int, data):
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                i = y * width + x
+                covered[i >> 3] |= 1 << (i & 7)
+
+    block = display.block
+    try:
+        display.block = record_outline
+        display.draw_polygon(sides, x0, y0, r, WHITE, rotate)
+        display.block = record_fill
+        display.fill_polygon(sides, x0, y0, r, WHITE, rotate)
+    finally:
+        display.block = block
+    return [(x, y) for x, y in outline
+            if not covered[(y * width + x) >> 3] >> ((y * width + x) & 7) & 1]
+
+def check_polygon_fill(display:Display):
+    """Print polygons whose fill does not cover their outline."""
+    failures = 0
+    for sides in (3, 4, 5, 6, 8, 12):
+        for r in (5, 20, 50):
+            for rotate in (0, 15, 45, 90):
+                gaps = polygon_fill_gaps(display, sides, r, rotate)
+                if gaps:
+                    failures += 1
+                    print(f"fill_polygon({sides}, r={r}, rotate={rotate}) misses {len(gaps)} outline pixels, e.g. {gaps[0]}")
+    print(f"Polygon fill check: {failures} failures")
+
 async def run(display:Display):
     """Testing"""
     try:
-        display.clear()
+        await display.clear_async()
 
         print('Loading monogram (smaller)')
-        monogram_small = XglcdFont('fonts/Monogram7x9.c', 7, 9)
+        monogram_small = XglcdFont('fonts/Monogram7x9.xgf')
         print('Loading monogram (bigger)')
-        monogram_big = XglcdFont('fonts/Monogram13x18.c', 13, 18)
+        monogram_big = XglcdFont('fonts/Monogram13x18.xgf')
 
         display.draw_letter(10, 10, "B", monogram_big, WHITE)
         display.draw_letter(30, 30, "B", monogram_big, WHITE)
         display.draw_letter_manual(50, 50, "B", monogram_big, WHITE)
 
+        check_polygon_fill(display)
+
     except asyncio.CancelledError:
         raise
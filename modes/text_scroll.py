@@ -2,6 +2,7 @@ import asyncio
 import re
 
 from lib.ili9341 import Display, color565
+from lib.text_layout import FixedFont, layout_text
 
 # ==============================================================================
 
@@ -10,6 +11,7 @@ TXT_FILE = "tao_te_ching.txt"
 # built-in font
 CHARACTER_WIDTH = 8
 CHARACTER_HEIGHT = 8
+BUILTIN_FONT = FixedFont(CHARACTER_WIDTH, CHARACTER_HEIGHT)
 
 CHARACTER_DELAY = 0.1 # delay between each typed character (s)
 SHORTER_DELAY   = 0.25 # commas, semicolons, colons (s)
@@ -26,7 +28,7 @@ Y_DISTANCE = 12 # distance between each line
 DISPLAY_WIDTH = 320
 DISPLAY_HEIGHT = 240
 
-MAX_LENGTH = (DISPLAY_WIDTH - X_OFFSET * 2) // CHARACTER_WIDTH # padding on either side (38)
+TEXT_WIDTH = DISPLAY_WIDTH - X_OFFSET * 2 # padding on either side (38 characters)
 MAX_LINES = (DISPLAY_HEIGHT - Y_OFFSET) // Y_DISTANCE # also padding at top and bottom (28)
 
 RED     = color565(255, 0, 0)
@@ -49,30 +51,14 @@ async def next_page(display: Display, cursor: dict[str, int]):
 
 # breaks line into array of multiple lines that fit screen width
 def break_line(text:str) -> list[str]:
-    lines: list[str] = []
-    words: list[str] = text.strip().split(' ')
-    line: str = ''
-
-    for word in words:
-        if len(line) + len(word) >= MAX_LENGTH:
-            lines.append(line)
-            line = word
-        else:
-            if line != '':
-                line += ' ' + word
-            else:
-                line = word
-
-    if line != '':
-        lines.append(line)
-
-    return lines
+    layout = layout_text(text.strip(), BUILTIN_FONT, TEXT_WIDTH, spacing=0)
+    return [line[0] for line in layout.lines]
 
 async def run(display:Display):
     """Scrolling text"""
     try:
         while True:
-            display.clear()
+            await display.clear_async()
             cursor = {'x': 0, 'y': 0}
 
             with open(f"text/{TXT_FILE}") as txt_file:
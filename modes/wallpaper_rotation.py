@@ -9,7 +9,7 @@ async def run(display:Display):
     """Updates wallpaper with randomly chosen image"""
     try:
 
-        display.draw_image(f"images/{IMAGES[0]}.raw")
+        await display.draw_rle_image_async(f"images/{IMAGES[0]}.rle")
 
         # current_image_index:int = -1
         #
@@ -19,7 +19,7 @@ async def run(display:Display):
         #     while new_index == current_image_index:
         #         new_index = randint(0, len(IMAGES) -1)
         #     current_image_index = new_index
-        #     display.draw_image(f"images/{IMAGES[current_image_index]}.raw")
+        #     await display.draw_rle_image_async(f"images/{IMAGES[current_image_index]}.rle")
         #
         #     await asyncio.sleep(5)
 